@@ -3,22 +3,34 @@ Aviation Graph RAG API - Main Application
 Production-ready FastAPI application for aviation customer support chatbot
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import Dict, Any
 
-from fastapi import FastAPI, HTTPException, Depends, status
+import httpx
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from pydantic import BaseModel
 import structlog
 
 from .routers import query, flights, aircraft, maintenance, audit, graph
 from .middleware import AuthMiddleware, LoggingMiddleware, MetricsMiddleware
 from .dependencies import get_current_user, get_graph_service, get_vector_service
 from ..core.config import settings
+from ..core.graph_rag import GraphRAGPipeline
 from ..core.monitoring import setup_monitoring
 
+def _orjson_dumps(obj: Any, **kwargs) -> str:
+    """orjson-backed serializer for structlog's JSONRenderer"""
+    return orjson.dumps(obj, default=kwargs.get("default")).decode()
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -30,7 +42,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps)
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -53,6 +65,20 @@ async def lifespan(app: FastAPI):
     # Initialize services
     from ..core.services import initialize_services
     await initialize_services()
+    await get_graph_service().create_indexes()
+    
+    # Shared keep-alive HTTP/2 pool for all OpenAI traffic
+    app.state.openai_http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        timeout=30
+    )
+    # Reuse the app's graph/vector services so each worker holds one Neo4j pool
+    app.state.pipeline = GraphRAGPipeline(
+        graph_service=get_graph_service(),
+        vector_service=get_vector_service(),
+        http_client=app.state.openai_http
+    )
     
     yield
     
@@ -60,6 +86,13 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Aviation Graph RAG API")
     from ..core.services import cleanup_services
     await cleanup_services()
+    await get_graph_service().close()
+    await app.state.pipeline.close()
+    await app.state.openai_http.aclose()
+
+def get_pipeline(request: Request) -> GraphRAGPipeline:
+    """FastAPI dependency returning the per-worker pipeline built in `lifespan`"""
+    return request.app.state.pipeline
 
 # Create FastAPI application
 app = FastAPI(
@@ -68,6 +101,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -134,6 +168,34 @@ app.include_router(
     dependencies=[Depends(get_current_user)]
 )
 
+class StreamQueryRequest(BaseModel):
+    """Request body for streaming queries"""
+    query: str
+    user_context: Dict[str, Any] = {}
+
+def _sse_frame(data: str, event: str = None) -> str:
+    """Format a Server-Sent Events frame"""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+@app.post(
+    "/api/v1/query/stream",
+    tags=["Query"],
+    dependencies=[Depends(get_current_user)]
+)
+async def stream_query(body: StreamQueryRequest, 
+                       pipeline: GraphRAGPipeline = Depends(get_pipeline)):
+    """Stream answer tokens as SSE, ending with a metadata event"""
+    async def event_stream():
+        async for event, payload in pipeline.process_query_stream(body.query, body.user_context):
+            if event == "token":
+                yield _sse_frame(payload)
+            else:
+                yield _sse_frame(orjson.dumps(payload, default=str).decode(), event=event)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -143,40 +205,50 @@ async def root():
         "status": "healthy"
     }
 
+HEALTH_CHECK_TIMEOUT = 0.5
+
+async def _check_service(service) -> Dict[str, Any]:
+    """Run one service health check, bounded by HEALTH_CHECK_TIMEOUT"""
+    try:
+        return await asyncio.wait_for(service.health_check(), timeout=HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"status": "unhealthy", "error": "timeout"}
+    except Exception as e:
+        return {"status": "unhealthy", "error": str(e)}
+
 @app.get("/health")
 async def health_check():
     """Comprehensive health check"""
-    try:
-        # Check database connections
-        graph_service = get_graph_service()
-        vector_service = get_vector_service()
-        
-        graph_status = await graph_service.health_check()
-        vector_status = await vector_service.health_check()
-        
-        return {
-            "status": "healthy",
-            "services": {
-                "graph_database": graph_status,
-                "vector_database": vector_status
-            },
-            "timestamp": structlog.processors.TimeStamper(fmt="iso")
-        }
-    except Exception as e:
-        logger.error("Health check failed", error=str(e))
+    # Check database connections concurrently
+    graph_status, vector_status = await asyncio.gather(
+        _check_service(get_graph_service()),
+        _check_service(get_vector_service())
+    )
+    services = {
+        "graph_database": graph_status,
+        "vector_database": vector_status
+    }
+    
+    healthy = [s.get("status") == "healthy" for s in services.values()]
+    if not any(healthy):
+        logger.error("Health check failed", services=services)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Service unavailable"
         )
+    
+    return {
+        "status": "healthy" if all(healthy) else "degraded",
+        "services": services,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
 
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-    from fastapi.responses import Response
-    
+    # Walking the registry is CPU-bound; keep it off the event loop
     return Response(
-        content=generate_latest(),
+        content=await asyncio.to_thread(generate_latest),
         media_type=CONTENT_TYPE_LATEST
     )
 
@@ -202,5 +274,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
+        # Each worker builds its own pipeline and bounded pools in `lifespan`
+        workers=1 if settings.DEBUG else getattr(settings, "WORKERS", 4),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     ) 
\ No newline at end of file
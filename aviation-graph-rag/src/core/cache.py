@@ -0,0 +1,263 @@
+"""
+Response Cache
+Exact and semantic caching of Graph RAG responses backed by Redis
+"""
+
+import functools
+import hashlib
+import pickle
+import re
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import numpy as np
+import structlog
+from prometheus_client import Counter
+from redis import asyncio as aioredis
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+CACHE_HITS = Counter(
+    "rag_cache_hits_total",
+    "Graph RAG response cache hits",
+    ["tier"]
+)
+
+# Tokens that pin a query to one flight, aircraft, part or airport: anything
+# containing a digit (AA123, 737-800, E-4521) and upper-case three-letter codes
+IDENTIFIER_PATTERN = re.compile(r"\b(?:[A-Za-z-]*\d[\w-]*|[A-Z]{3})\b")
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for exact-match cache keys"""
+    return " ".join(query.lower().split())
+
+def query_identifiers(query: str) -> FrozenSet[str]:
+    """Identifiers a semantic hit must share with the query it answers"""
+    return frozenset(token.upper() for token in IDENTIFIER_PATTERN.findall(query))
+
+class SemanticIndex:
+    """In-process ring buffer of unit query vectors pointing at exact cache keys
+
+    Vectors are only compared within a partition (user scope plus query
+    identifiers), so "Is DL456 delayed?" never matches a cached AA123 answer.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # Allocated on the first add, once the embedding width is known
+        self._vectors: Optional[np.ndarray] = None
+        self._keys = np.empty(max_entries, dtype=object)
+        self._partitions = np.empty(max_entries, dtype=object)
+        self._size = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def partition(scope: str, identifiers: FrozenSet[str]) -> str:
+        return "|".join([scope, *sorted(identifiers)])
+
+    def add(self, vector: np.ndarray, key: str, partition: str):
+        """Store a unit vector, overwriting the oldest entry when full"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        slot = self._next
+        self._vectors[slot] = vector
+        self._keys[slot] = key
+        self._partitions[slot] = partition
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def search(self, vector: np.ndarray, partition: str, threshold: float) -> Optional[int]:
+        """Slot of the most similar vector in the partition, if above threshold"""
+        if not self._size:
+            return None
+
+        # Both sides are unit-normalized, so the dot product is the cosine
+        scores = self._vectors[:self._size] @ vector
+        scores[self._partitions[:self._size] != partition] = -np.inf
+        best = int(np.argmax(scores))
+        return best if scores[best] >= threshold else None
+
+    def key(self, slot: int) -> str:
+        return self._keys[slot]
+
+    def discard(self, slot: int):
+        """Stop matching a slot whose response has expired"""
+        self._partitions[slot] = None
+
+class ResponseCache:
+    """Two-tier (exact + semantic) cache for pipeline responses
+
+    Responses live in Redis and are shared by all workers; the semantic
+    index over their query vectors is kept in each worker's memory.
+    """
+
+    RESPONSE_PREFIX = "rag:response:"
+
+    def __init__(self, redis_url: str = None, ttl: int = None,
+                 similarity_threshold: float = None, max_entries: int = None):
+        self.redis = aioredis.from_url(
+            redis_url or getattr(settings, "REDIS_URL", "redis://localhost:6379")
+        )
+        self.ttl = ttl or getattr(settings, "RESPONSE_CACHE_TTL", 3600)
+        self.similarity_threshold = similarity_threshold or getattr(
+            settings, "SEMANTIC_CACHE_THRESHOLD", 0.95
+        )
+        self.index = SemanticIndex(
+            max_entries or getattr(settings, "SEMANTIC_CACHE_MAX_ENTRIES", 1000)
+        )
+
+    def make_key(self, query: str, scope: str) -> str:
+        """Build the exact-match key from model, normalized query and scope"""
+        raw = f"{settings.LLM_MODEL}|{normalize_query(query)}|{scope}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get_exact(self, key: str) -> Optional[Any]:
+        """Return the cached response stored under an exact key"""
+        payload = await self.redis.get(self.RESPONSE_PREFIX + key)
+        return pickle.loads(payload) if payload else None
+
+    async def get_semantic(self, query: str, query_embedding: np.ndarray,
+                           scope: str) -> Optional[Any]:
+        """Return the cached response of the most similar previous query"""
+        partition = self.index.partition(scope, query_identifiers(query))
+        slot = self.index.search(self._unit(query_embedding), partition,
+                                 self.similarity_threshold)
+        if slot is None:
+            return None
+
+        response = await self.get_exact(self.index.key(slot))
+        if response is None:
+            self.index.discard(slot)
+        return response
+
+    async def set(self, key: str, query: str, scope: str, response: Any,
+                  query_embedding: Optional[np.ndarray] = None):
+        """Store a response and, optionally, index its query vector"""
+        await self.redis.setex(self.RESPONSE_PREFIX + key, self.ttl, pickle.dumps(response))
+
+        if query_embedding is not None:
+            partition = self.index.partition(scope, query_identifiers(query))
+            self.index.add(self._unit(query_embedding), key, partition)
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        await self.redis.close()
+
+class CachedEmbeddings:
+    """Redis-backed cache in front of an embeddings client"""
+
+    EMBEDDING_PREFIX = "rag:embedding:"
+
+    def __init__(self, embeddings, redis, model: str, ttl: int = 24 * 60 * 60):
+        self.embeddings = embeddings
+        self.redis = redis
+        self.model = model
+        self.ttl = ttl
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{text}|{self.model}".encode()).hexdigest()
+        return self.EMBEDDING_PREFIX + digest
+
+    async def _store(self, key: str, vector: List[float]):
+        # fp16 halves the stored bytes at negligible cosine-accuracy loss
+        await self.redis.set(key, np.asarray(vector, dtype=np.float16).tobytes(), ex=self.ttl)
+
+    @staticmethod
+    def _load(payload: bytes) -> List[float]:
+        return np.frombuffer(payload, dtype=np.float16).astype(np.float32).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single query, serving repeats from the cache"""
+        key = self._key(text)
+        try:
+            payload = await self.redis.get(key)
+            if payload:
+                return self._load(payload)
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed", error=str(e))
+
+        vector = await self.embeddings.aembed_query(text)
+
+        try:
+            await self._store(key, vector)
+        except Exception as e:
+            logger.warning("Embedding cache store failed", error=str(e))
+
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with one batched upstream call for the uncached ones"""
+        if not texts:
+            return []
+
+        keys = [self._key(text) for text in texts]
+        try:
+            payloads = await self.redis.mget(keys)
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed", error=str(e))
+            payloads = [None] * len(texts)
+
+        vectors = [self._load(p) if p else None for p in payloads]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            fresh = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+                try:
+                    await self._store(keys[i], vector)
+                except Exception as e:
+                    logger.warning("Embedding cache store failed", error=str(e))
+
+        return vectors
+
+def cached_response(func):
+    """Serve `process_query` from the response cache when possible"""
+
+    @functools.wraps(func)
+    async def wrapper(self, query: str, user_context: Dict[str, Any] = None):
+        cache: ResponseCache = self.response_cache
+        scope = str((user_context or {}).get("user_id", "global"))
+        key = cache.make_key(query, scope)
+        query_embedding = None
+
+        try:
+            response = await cache.get_exact(key)
+            if response is not None:
+                CACHE_HITS.labels(tier="exact").inc()
+                return response
+
+            # Served from the embedding cache again by `_search_vector`
+            query_embedding = await self.embeddings.aembed_query(query)
+            response = await cache.get_semantic(query, query_embedding, scope)
+            if response is not None:
+                CACHE_HITS.labels(tier="semantic").inc()
+                return response
+        except Exception as e:
+            logger.warning("Response cache lookup failed", error=str(e))
+
+        response = await func(self, query, user_context)
+
+        # Answers produced during an outage must not outlive it
+        if response.metadata.get("degraded"):
+            logger.info("Degraded response not cached", scope=scope)
+            return response
+
+        try:
+            await cache.set(key, query, scope, response, query_embedding)
+        except Exception as e:
+            logger.warning("Response cache store failed", error=str(e))
+
+        return response
+
+    return wrapper
@@ -4,9 +4,15 @@ Production-ready Graph RAG system for aviation domain
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import functools
+import math
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from dataclasses import dataclass
+import httpx
+import numpy as np
 import structlog
+import tiktoken
+from openai import AsyncOpenAI
 
 from langchain.schema import Document
 from langchain.embeddings import OpenAIEmbeddings
@@ -15,13 +21,45 @@ from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.runnable import RunnablePassthrough
 from langchain.schema.output_parser import StrOutputParser
+from langchain_core.output_parsers import JsonOutputParser
+from neo4j.graph import Node, Relationship
 
-from .graph_service import GraphService
-from .vector_service import VectorService
+from .graph_service import GraphNode, GraphRelationship, GraphService
+from .vector_service import VectorHits, VectorService
+from .cache import CachedEmbeddings, ResponseCache, cached_response
 from .config import settings
 
 logger = structlog.get_logger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """Tokenizer for the response model, shared across requests"""
+    try:
+        return tiktoken.encoding_for_model(settings.LLM_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+# Logistic confidence calibration: a strong top vector match dominates,
+# while additional graph/vector hits add diminishing support
+CONFIDENCE_SCORE_WEIGHT = 4.0
+CONFIDENCE_HITS_WEIGHT = 1.0
+CONFIDENCE_BIAS = 3.0
+
+# Speculative RAG: keep the preliminary answer when the fused context still
+# holds mostly the same documents and adds at most this many graph nodes
+SPECULATION_OVERLAP_THRESHOLD = 0.8
+SPECULATION_MAX_GRAPH_NODES = 1
+
+EMPTY_GRAPH_CONTEXT = {'nodes': [], 'relationships': [], 'paths': []}
+
+def _jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two sets (1.0 when both are empty)"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+FALLBACK_RESPONSE = "I apologize, but I'm unable to process your request at the moment. Please try again later."
+
 @dataclass
 class QueryContext:
     """Context information for a query"""
@@ -41,65 +79,131 @@ class GraphRAGResponse:
     graph_paths: List[Dict[str, Any]]
     vector_sources: List[Document]
     metadata: Dict[str, Any]
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Plain-dict form for ORJSONResponse (numpy values are handled by orjson)"""
+        return {
+            "answer": self.answer,
+            "sources": self.sources,
+            "confidence": self.confidence,
+            "graph_paths": self.graph_paths,
+            "vector_sources": [
+                {"page_content": doc.page_content, "metadata": doc.metadata}
+                for doc in self.vector_sources
+            ],
+            "metadata": self.metadata
+        }
 
 class GraphRAGPipeline:
     """Production-ready Graph RAG pipeline for aviation domain"""
     
-    def __init__(self):
-        self.graph_service = GraphService()
-        self.vector_service = VectorService()
+    # Seed phrases whose mean embedding forms each intent centroid
+    INTENT_SEED_PHRASES = {
+        "flight_info": [
+            "What is the status of flight AA123?",
+            "Is my flight delayed or cancelled?",
+            "When does the flight from JFK to LAX depart?",
+            "Flight schedule and arrival time",
+        ],
+        "safety": [
+            "What are the emergency evacuation procedures?",
+            "Which FAA regulations apply to this safety protocol?",
+            "Safety requirements for handling hazardous materials",
+            "Emergency procedures for cabin depressurization",
+        ],
+        "maintenance": [
+            "When was the last maintenance on this engine?",
+            "Repair procedure for the landing gear actuator",
+            "Maintenance history for equipment ID E-4521",
+            "Inspection schedule for the auxiliary power unit",
+        ],
+        "customer_service": [
+            "How much baggage can I bring on board?",
+            "How do I change my booking?",
+            "Where is the boarding gate and when does boarding start?",
+            "My luggage was lost, what should I do?",
+        ],
+        "technical": [
+            "What is the range of a Boeing 737 MAX?",
+            "How does the Airbus A320 fly-by-wire system work?",
+            "Engine specifications of the Boeing 787",
+            "Seating capacity and cruise speed of the A350",
+        ],
+    }
+    
+    def __init__(self, graph_service: Optional[GraphService] = None,
+                 vector_service: Optional[VectorService] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        # Injected services are shared with the app, which also closes them
+        self._owns_graph_service = graph_service is None
+        self.graph_service = graph_service or GraphService()
+        self.vector_service = vector_service or VectorService()
+        self.response_cache = ResponseCache()
+        
+        # The LangChain clients only take the shared HTTP pool through
+        # prebuilt OpenAI clients; chat may target LLM_BASE_URL, embeddings not
+        llm_base_url = getattr(settings, "LLM_BASE_URL", None)
+        chat_client = AsyncOpenAI(http_client=http_client, base_url=llm_base_url)
+        embeddings_client = AsyncOpenAI(http_client=http_client)
+        
         self.llm = ChatOpenAI(
             model=settings.LLM_MODEL,
             temperature=0.1,
-            max_tokens=1000
+            max_tokens=1000,
+            base_url=llm_base_url,
+            async_client=chat_client.chat.completions
+        )
+        # JSON mode guarantees parseable entity extraction
+        self.entity_llm = ChatOpenAI(
+            model=settings.LLM_MODEL,
+            temperature=0.0,
+            max_tokens=300,
+            model_kwargs={"response_format": {"type": "json_object"}},
+            base_url=llm_base_url,
+            async_client=chat_client.chat.completions
         )
-        self.embeddings = OpenAIEmbeddings(
+        self.embeddings = CachedEmbeddings(
+            OpenAIEmbeddings(model=settings.EMBEDDING_MODEL,
+                             async_client=embeddings_client.embeddings),
+            redis=self.response_cache.redis,
             model=settings.EMBEDDING_MODEL
         )
         
+        # Built lazily from INTENT_SEED_PHRASES on the first query
+        self.intent_labels: List[str] = list(self.INTENT_SEED_PHRASES)
+        self.intent_centroids: Optional[np.ndarray] = None
+        
+        # Load the tokenizer now: a first use on the request path would fetch
+        # its BPE file synchronously (see TIKTOKEN_CACHE_DIR in the README)
+        _get_encoding()
+        
         # Initialize prompt templates
         self._setup_prompts()
     
     def _setup_prompts(self):
         """Setup prompt templates for different query types"""
         
-        # Intent classification prompt
-        self.intent_prompt = ChatPromptTemplate.from_template("""
-        Classify the following aviation-related query into one of these categories:
-        - flight_info: Flight schedules, status, delays, cancellations
-        - safety: Safety protocols, regulations, emergency procedures
-        - maintenance: Equipment maintenance, repair procedures
-        - customer_service: Booking, baggage, boarding assistance
-        - technical: Aircraft specifications, systems information
-        
-        Query: {query}
-        
-        Respond with only the category name.
-        """)
-        
         # Entity extraction prompt
         self.entity_prompt = ChatPromptTemplate.from_template("""
-        Extract aviation-specific entities from the query:
-        - Aircraft types (e.g., Boeing 737, Airbus A320)
-        - Flight numbers (e.g., AA123, DL456)
-        - Airport codes (e.g., JFK, LAX, ORD)
-        - Equipment IDs (e.g., Engine serial numbers)
-        - Safety protocols (e.g., emergency procedures)
+        Extract aviation-specific entities from the query, using these types:
+        - aircraft_type (e.g., Boeing 737, Airbus A320)
+        - flight_number (e.g., AA123, DL456)
+        - airport_code (e.g., JFK, LAX, ORD)
+        - equipment_id (e.g., Engine serial numbers)
+        - safety_protocol (e.g., emergency procedures)
         
         Query: {query}
         
-        Return as JSON with entity types and values.
+        Respond with a JSON object of the form:
+        {{"entities": [{{"type": "<entity type>", "value": "<value>"}}]}}
         """)
         
         # Graph RAG response generation prompt
+        # Static instructions come first and the query last, so the shared
+        # prefix (instructions + context) can be reused by prefix caching
         self.response_prompt = ChatPromptTemplate.from_template("""
         You are an aviation customer support assistant. Use the provided context to answer the query accurately and professionally.
         
-        Query: {query}
-        
-        Graph Context: {graph_context}
-        Vector Context: {vector_context}
-        
         Guidelines:
         - Be precise and accurate with aviation terminology
         - Include relevant safety information when applicable
@@ -107,34 +211,45 @@ class GraphRAGPipeline:
         - Cite sources when possible
         - Maintain professional tone
         
+        Context:
+        {context}
+        
+        Query: {query}
+        
         Answer:
         """)
+        
+        # Chains are composed once and reused across requests
+        self.entity_chain = self.entity_prompt | self.entity_llm | JsonOutputParser()
+        self.response_chain = self.response_prompt | self.llm | StrOutputParser()
     
+    @cached_response
     async def process_query(self, query: str, user_context: Dict[str, Any] = None) -> GraphRAGResponse:
         """Main query processing pipeline"""
         
         logger.info("Processing query", query=query)
         
-        # Step 1: Intent classification
-        intent = await self._classify_intent(query)
-        
-        # Step 2: Entity extraction
-        entities = await self._extract_entities(query)
-        
-        # Step 3: Graph traversal
-        graph_context = await self._traverse_graph(query, intent, entities)
-        
-        # Step 4: Vector search
-        vector_context = await self._search_vector(query, intent)
-        
-        # Step 5: Context fusion
-        fused_context = await self._fuse_context(graph_context, vector_context)
-        
-        # Step 6: Response generation
-        response = await self._generate_response(query, fused_context, user_context)
+        if getattr(settings, "SPECULATIVE_RAG", False):
+            # Steps 1-6 with generation overlapping graph traversal
+            intent, entities, graph_context, vector_context, fused_context, response = \
+                await self._speculative_query(query, user_context)
+        else:
+            # Steps 1-5: Query analysis, retrieval and context fusion
+            intent, entities, graph_context, vector_context, fused_context = \
+                await self._retrieve_context(query)
+            
+            # Step 6: Response generation
+            response = await self._generate_response(query, fused_context, user_context)
         
         # Step 7: Quality assessment
-        confidence = await self._assess_confidence(response, query, fused_context)
+        confidence = self._assess_confidence(
+            fused_context['top_vector_score'],
+            len(fused_context['graph_nodes']),
+            len(fused_context['vector_documents'])
+        )
+        
+        # Answers from a failed stage are returned but never cached
+        degraded = fused_context['degraded'] or response == FALLBACK_RESPONSE
         
         return GraphRAGResponse(
             answer=response,
@@ -145,42 +260,216 @@ class GraphRAGPipeline:
             metadata={
                 "intent": intent,
                 "entities": entities,
+                "degraded": degraded,
                 "processing_time": None  # TODO: Add timing
             }
         )
     
-    async def _classify_intent(self, query: str) -> str:
-        """Classify query intent"""
+    async def process_query_stream(self, query: str, 
+                                   user_context: Dict[str, Any] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming variant of `process_query`
+        
+        Yields ("token", text) events as the answer is generated, followed by
+        a single ("metadata", dict) event carrying confidence and sources.
+        """
+        
+        logger.info("Processing streaming query", query=query)
+        
+        intent, entities, graph_context, vector_context, fused_context = \
+            await self._retrieve_context(query)
+        
+        chunks = []
+        try:
+            async for chunk in self.response_chain.astream(self._response_inputs(query, fused_context, user_context)):
+                chunks.append(chunk)
+                yield "token", chunk
+        except Exception as e:
+            logger.error("Response streaming failed", error=str(e))
+            if not chunks:
+                chunks.append(FALLBACK_RESPONSE)
+                yield "token", FALLBACK_RESPONSE
+        
+        confidence = self._assess_confidence(
+            fused_context['top_vector_score'],
+            len(fused_context['graph_nodes']),
+            len(fused_context['vector_documents'])
+        )
+        
+        yield "metadata", {
+            "sources": self._extract_sources(graph_context, vector_context),
+            "confidence": confidence,
+            "graph_paths": graph_context.get("paths", []),
+            "intent": intent,
+            "entities": entities
+        }
+    
+    async def _retrieve_context(self, query: str) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any], 
+                                                           List[Document], Dict[str, Any]]:
+        """Run analysis, retrieval and fusion steps shared by all query modes"""
+        
+        # Steps 1-2: Query embedding, intent and entities
+        query_embedding, intent, entities = await self._analyze_query(query)
+        
+        # Steps 3-4: Graph traversal and vector search (independent)
+        graph_context, vector_hits = await self._run_concurrently(
+            self._traverse_graph(query, intent, entities),
+            self._search_vector(query_embedding, intent)
+        )
+        
+        # Step 5: Context fusion (documents are materialized only for packed hits)
+        fused_context = await self._fuse_context(graph_context, vector_hits)
+        vector_context = fused_context['vector_sources']
+        
+        return intent, entities or [], graph_context, vector_context, fused_context
+    
+    async def _speculative_query(self, query: str, user_context: Dict[str, Any] = None) -> Tuple[
+            str, List[Dict[str, Any]], Dict[str, Any], List[Document], Dict[str, Any], str]:
+        """Steps 1-6, starting generation from vector context while the graph is traversed
+        
+        The preliminary answer is kept when the full fused context keeps nearly
+        the same documents and the graph adds little; otherwise it is
+        cancelled and regenerated.
+        """
+        
+        query_embedding, intent, entities = await self._analyze_query(query)
+        
+        graph_task = asyncio.create_task(self._traverse_graph(query, intent, entities))
+        prelim_task = None
         try:
-            chain = self.intent_prompt | self.llm | StrOutputParser()
-            intent = await chain.ainvoke({"query": query})
-            logger.info("Intent classified", intent=intent, query=query)
-            return intent.strip().lower()
+            vector_hits = await self._search_vector(query_embedding, intent)
+            prelim_context = await self._fuse_context(EMPTY_GRAPH_CONTEXT, vector_hits)
+            prelim_task = asyncio.create_task(
+                self._generate_response(query, prelim_context, user_context)
+            )
+            
+            graph_context = await graph_task
+            fused_context = await self._fuse_context(graph_context, vector_hits)
+            
+            # Graph nodes are never in the preliminary context, so they are
+            # bounded separately rather than counted against the overlap
+            overlap = _jaccard(self._document_ids(prelim_context),
+                               self._document_ids(fused_context))
+            graph_nodes = len(fused_context['graph_nodes'])
+            accepted = (overlap > SPECULATION_OVERLAP_THRESHOLD
+                        and graph_nodes <= SPECULATION_MAX_GRAPH_NODES)
+            if accepted:
+                response = await prelim_task
+                # Sources and confidence describe the context the answer was
+                # generated from; failures of the full retrieval still count
+                graph_context = EMPTY_GRAPH_CONTEXT
+                fused_context = {**prelim_context, 'degraded': fused_context['degraded']}
+            else:
+                prelim_task.cancel()
+                response = await self._generate_response(query, fused_context, user_context)
+            
+            logger.info("Speculative generation finished", overlap=overlap,
+                       graph_nodes=graph_nodes, accepted=accepted)
+        except BaseException:
+            graph_task.cancel()
+            if prelim_task is not None:
+                prelim_task.cancel()
+            raise
+        
+        vector_context = fused_context['vector_sources']
+        return intent, entities or [], graph_context, vector_context, fused_context, response
+    
+    @staticmethod
+    def _document_ids(fused_context: Dict[str, Any]) -> set:
+        """Identify the vector documents packed into a fused context"""
+        return {doc.metadata.get('id') for doc in fused_context['vector_sources']}
+    
+    async def _analyze_query(self, query: str) -> Tuple[Optional[np.ndarray], str, Optional[List[Dict[str, Any]]]]:
+        """Embed the query and extract entities concurrently, then classify intent"""
+        query_embedding, entities = await self._run_concurrently(
+            self._embed_query(query),
+            self._extract_entities(query)
+        )
+        intent = await self._classify_intent(query_embedding)
+        return query_embedding, intent, entities
+    
+    async def close(self):
+        """Release the pipeline's Redis connections and any graph driver it created"""
+        if self._owns_graph_service:
+            await self.graph_service.close()
+        await self.response_cache.close()
+    
+    async def _run_concurrently(self, *coros) -> Tuple[Any, ...]:
+        """Await independent pipeline stages concurrently, preserving order"""
+        if hasattr(asyncio, "TaskGroup"):
+            # Python 3.11+: a failing branch cancels its siblings
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(coro) for coro in coros]
+            return tuple(task.result() for task in tasks)
+        
+        return tuple(await asyncio.gather(*coros))
+    
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed the query once for intent classification and vector search"""
+        try:
+            return np.asarray(await self.embeddings.aembed_query(query), dtype=np.float32)
+        except Exception as e:
+            logger.error("Query embedding failed", error=str(e))
+            return None
+    
+    async def _build_intent_centroids(self):
+        """Embed the seed phrases and average them into unit-norm centroids"""
+        phrases = [p for label in self.intent_labels for p in self.INTENT_SEED_PHRASES[label]]
+        vectors = np.asarray(await self.embeddings.aembed_documents(phrases), dtype=np.float32)
+        
+        centroids = []
+        offset = 0
+        for label in self.intent_labels:
+            count = len(self.INTENT_SEED_PHRASES[label])
+            centroids.append(vectors[offset:offset + count].mean(axis=0))
+            offset += count
+        
+        centroids = np.stack(centroids)
+        self.intent_centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+    
+    async def _classify_intent(self, query_embedding: Optional[np.ndarray]) -> str:
+        """Classify query intent by nearest centroid (cosine similarity)"""
+        if query_embedding is None:
+            return "general"
+        
+        try:
+            if self.intent_centroids is None:
+                await self._build_intent_centroids()
+            
+            scores = self.intent_centroids @ (query_embedding / np.linalg.norm(query_embedding))
+            intent = self.intent_labels[int(np.argmax(scores))]
+            logger.info("Intent classified", intent=intent)
+            return intent
         except Exception as e:
             logger.error("Intent classification failed", error=str(e))
             return "general"
     
-    async def _extract_entities(self, query: str) -> List[Dict[str, Any]]:
-        """Extract aviation-specific entities"""
+    async def _extract_entities(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Extract aviation-specific entities (None when extraction fails)"""
         try:
-            chain = self.entity_prompt | self.llm | StrOutputParser()
-            entities_json = await chain.ainvoke({"query": query})
-            # TODO: Parse JSON response
-            entities = []  # Placeholder
+            result = await self.entity_chain.ainvoke({"query": query})
+            entities = [
+                entity for entity in result.get("entities", [])
+                if isinstance(entity, dict) and entity.get("value")
+            ]
             logger.info("Entities extracted", entities=entities, query=query)
             return entities
         except Exception as e:
             logger.error("Entity extraction failed", error=str(e))
-            return []
+            return None
     
-    async def _traverse_graph(self, query: str, intent: str, entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _traverse_graph(self, query: str, intent: str,
+                              entities: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Traverse Neo4j knowledge graph"""
+        if entities is None:
+            # Extraction failed, so the graph cannot be queried for this request
+            return {**EMPTY_GRAPH_CONTEXT, 'failed': True}
+        
         try:
             # Build Cypher query based on intent and entities
-            cypher_query = self._build_cypher_query(intent, entities)
+            cypher_query, params = self._build_cypher_query(intent, entities)
             
-            # Execute graph traversal
-            result = await self.graph_service.execute_query(cypher_query)
+            # Execute graph traversal (one round-trip for all entities)
+            result = await self.graph_service.execute_query(cypher_query, params)
             
             # Process and structure results
             graph_context = self._process_graph_results(result, intent)
@@ -193,85 +482,100 @@ class GraphRAGPipeline:
             
         except Exception as e:
             logger.error("Graph traversal failed", error=str(e))
-            return {"nodes": [], "relationships": [], "paths": []}
+            return {**EMPTY_GRAPH_CONTEXT, 'failed': True}
     
-    def _build_cypher_query(self, intent: str, entities: List[Dict[str, Any]]) -> str:
-        """Build Cypher query based on intent and entities"""
+    def _build_cypher_query(self, intent: str, 
+                           entities: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Build a batched, parameterized Cypher query based on intent and entities"""
+        
+        def values_of(entity_type: str) -> List[str]:
+            return [e["value"] for e in entities if e.get("type") == entity_type]
         
         if intent == "flight_info":
             return """
-            MATCH (f:Flight)-[:DEPARTS_FROM]->(dep:Airport)
+            UNWIND $flight_numbers AS fn
+            MATCH (f:Flight {flight_number: fn})-[:DEPARTS_FROM]->(dep:Airport)
             MATCH (f)-[:ARRIVES_AT]->(arr:Airport)
             MATCH (f)-[:OPERATED_BY]->(a:Aircraft)
-            WHERE f.flight_number CONTAINS $flight_number
             RETURN f, dep, arr, a
             LIMIT 10
-            """
+            """, {"flight_numbers": values_of("flight_number")}
         
         elif intent == "safety":
             return """
+            UNWIND $protocol_names AS pn
             MATCH (sp:SafetyProtocol)-[:ENFORCED_BY]->(r:Regulation)
+            WHERE sp.name CONTAINS pn
             MATCH (sp)-[:APPLIES_TO]->(e:Equipment)
-            WHERE sp.name CONTAINS $protocol_name
             RETURN sp, r, e
             LIMIT 10
-            """
+            """, {"protocol_names": values_of("safety_protocol")}
         
         elif intent == "maintenance":
             return """
-            MATCH (m:Maintenance)-[:PERFORMED_ON]->(e:Equipment)
+            UNWIND $equipment_ids AS eid
+            MATCH (m:Maintenance)-[:PERFORMED_ON]->(e:Equipment {equipment_id: eid})
             MATCH (m)-[:FOLLOWS]->(p:Procedure)
-            WHERE e.equipment_id = $equipment_id
             RETURN m, e, p
             LIMIT 10
-            """
+            """, {"equipment_ids": values_of("equipment_id")}
         
         else:
             return """
+            UNWIND $search_terms AS term
             MATCH (n)
-            WHERE n.name CONTAINS $search_term
+            WHERE n.name CONTAINS term
             RETURN n
             LIMIT 5
-            """
+            """, {"search_terms": [e["value"] for e in entities]}
     
-    def _process_graph_results(self, results: List[Dict], intent: str) -> Dict[str, Any]:
+    def _process_graph_results(self, results: List[Any], intent: str) -> Dict[str, Any]:
         """Process and structure graph query results"""
-        nodes = []
-        relationships = []
-        paths = []
-        
-        for result in results:
-            # Extract nodes and relationships
-            for key, value in result.items():
-                if hasattr(value, 'labels'):  # Node
-                    nodes.append({
-                        'id': value.identity,
-                        'labels': list(value.labels),
-                        'properties': dict(value)
-                    })
-                elif hasattr(value, 'type'):  # Relationship
-                    relationships.append({
-                        'id': value.identity,
-                        'type': value.type,
-                        'properties': dict(value)
-                    })
+        values = [value for record in results for value in record.values()]
+        
+        # Rows repeat shared entities (e.g. the same airport); keep one of each
+        unique_nodes = {
+            value.element_id: value for value in values if isinstance(value, (Node, GraphNode))
+        }
+        unique_rels = {
+            value.element_id: value for value in values
+            if isinstance(value, (Relationship, GraphRelationship))
+        }
+        
+        nodes = [
+            {
+                'id': value.element_id,
+                'labels': list(value.labels),
+                'properties': dict(value)
+            }
+            for value in unique_nodes.values()
+        ]
+        relationships = [
+            {
+                'id': value.element_id,
+                'type': value.type,
+                'properties': dict(value)
+            }
+            for value in unique_rels.values()
+        ]
         
         return {
             'nodes': nodes,
             'relationships': relationships,
-            'paths': paths,
+            'paths': [],
             'intent': intent
         }
     
-    async def _search_vector(self, query: str, intent: str) -> List[Document]:
+    async def _search_vector(self, query_embedding: Optional[np.ndarray], intent: str) -> VectorHits:
         """Search vector database for relevant documents"""
+        if query_embedding is None:
+            # Embedding failed, so the search could not run
+            return VectorHits.empty(failed=True)
+        
         try:
-            # Get embeddings for query
-            query_embedding = await self.embeddings.aembed_query(query)
-            
             # Search vector database
             results = await self.vector_service.search(
-                query_embedding,
+                query_embedding.tolist(),
                 k=5,
                 filter={"intent": intent}
             )
@@ -284,75 +588,113 @@ class GraphRAGPipeline:
             
         except Exception as e:
             logger.error("Vector search failed", error=str(e))
-            return []
+            return VectorHits.empty(failed=True)
     
     async def _fuse_context(self, graph_context: Dict[str, Any], 
-                           vector_context: List[Document]) -> Dict[str, Any]:
+                           vector_hits: VectorHits) -> Dict[str, Any]:
         """Fuse graph and vector context"""
         
+        # Drop hits repeated from the same source before they reach the prompt
+        seen_sources = set()
+        unique_indices = []
+        for i, metadata in enumerate(vector_hits.metadatas):
+            source = metadata.get("source")
+            if source is not None:
+                if source in seen_sources:
+                    continue
+                seen_sources.add(source)
+            unique_indices.append(i)
+        
+        combined_context, packed_indices = self._combine_contexts(
+            graph_context, vector_hits, unique_indices
+        )
+        vector_sources = vector_hits.to_documents(packed_indices)
+        
         # Combine graph and vector information
         fused_context = {
             'graph_nodes': graph_context.get('nodes', []),
             'graph_relationships': graph_context.get('relationships', []),
-            'vector_documents': [doc.page_content for doc in vector_context],
-            'combined_context': self._combine_contexts(graph_context, vector_context)
+            'vector_documents': [doc.page_content for doc in vector_sources],
+            'vector_sources': vector_sources,
+            'top_vector_score': float(vector_hits.scores.max()) if len(vector_hits) else 0.0,
+            'combined_context': combined_context,
+            'degraded': bool(graph_context.get('failed')) or vector_hits.failed
         }
         
         return fused_context
     
-    def _combine_contexts(self, graph_context: Dict[str, Any], 
-                         vector_context: List[Document]) -> str:
-        """Combine graph and vector context into text"""
+    def _combine_contexts(self, graph_context: Dict[str, Any], vector_hits: VectorHits,
+                         indices: List[int]) -> Tuple[str, List[int]]:
+        """Combine graph and vector context into text within the token budget
         
-        context_parts = []
+        Returns the packed text and the indices of the vector hits it includes.
+        """
         
-        # Add graph context
+        # (text, vector hit index or None)
+        candidates = []
+        
+        # Graph facts first, then documents in retrieval (score) order
         if graph_context.get('nodes'):
-            context_parts.append("Graph Information:")
+            candidates.append(("Graph Information:", None))
             for node in graph_context['nodes']:
-                context_parts.append(f"- {node['labels'][0]}: {node['properties'].get('name', 'N/A')}")
+                candidates.append((f"- {node['labels'][0]}: {node['properties'].get('name', 'N/A')}", None))
         
-        # Add vector context
-        if vector_context:
-            context_parts.append("\nRelated Documents:")
-            for doc in vector_context:
-                context_parts.append(f"- {doc.page_content[:200]}...")
+        if indices:
+            candidates.append(("\nRelated Documents:", None))
+            for i in indices:
+                candidates.append((f"- {vector_hits.texts[i]}", i))
         
-        return "\n".join(context_parts)
+        # Greedily pack parts until the budget is hit, truncating the last one
+        encoding = _get_encoding()
+        remaining = getattr(settings, "CONTEXT_TOKEN_BUDGET", 3000)
+        context_parts = []
+        packed_indices = []
+        for part, index in candidates:
+            tokens = encoding.encode(part)
+            if len(tokens) >= remaining:
+                if remaining > 0:
+                    context_parts.append(encoding.decode(tokens[:remaining]) + "...")
+                    if index is not None:
+                        packed_indices.append(index)
+                break
+            context_parts.append(part)
+            if index is not None:
+                packed_indices.append(index)
+            remaining -= len(tokens) + 1  # newline separator
+        
+        return "\n".join(context_parts), packed_indices
     
     async def _generate_response(self, query: str, fused_context: Dict[str, Any], 
                                 user_context: Dict[str, Any] = None) -> str:
         """Generate final response using LLM"""
         
         try:
-            chain = self.response_prompt | self.llm | StrOutputParser()
-            
-            response = await chain.ainvoke({
-                "query": query,
-                "graph_context": fused_context.get('combined_context', ''),
-                "vector_context": fused_context.get('vector_documents', []),
-                "user_context": user_context or {}
-            })
+            response = await self.response_chain.ainvoke(self._response_inputs(query, fused_context, user_context))
             
             logger.info("Response generated", query=query)
             return response
             
         except Exception as e:
             logger.error("Response generation failed", error=str(e))
-            return "I apologize, but I'm unable to process your request at the moment. Please try again later."
+            return FALLBACK_RESPONSE
     
-    async def _assess_confidence(self, response: str, query: str, 
-                                context: Dict[str, Any]) -> float:
-        """Assess confidence in the generated response"""
-        
-        # Simple confidence assessment based on context availability
-        graph_nodes = len(context.get('graph_nodes', []))
-        vector_docs = len(context.get('vector_documents', []))
-        
-        # Base confidence on available context
-        confidence = min(0.9, (graph_nodes + vector_docs) / 10.0)
-        
-        return max(0.1, confidence)  # Minimum 10% confidence
+    def _response_inputs(self, query: str, fused_context: Dict[str, Any], 
+                         user_context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the response prompt variables"""
+        return {
+            "query": query,
+            "context": fused_context.get('combined_context', ''),
+            "user_context": user_context or {}
+        }
+    
+    def _assess_confidence(self, top_score: float, graph_hits: int, vector_hits: int) -> float:
+        """Logistic confidence over the best vector score and the amount of context"""
+        logit = (
+            CONFIDENCE_SCORE_WEIGHT * top_score
+            + CONFIDENCE_HITS_WEIGHT * math.log1p(graph_hits + vector_hits)
+            - CONFIDENCE_BIAS
+        )
+        return 1.0 / (1.0 + math.exp(-logit))
     
     def _extract_sources(self, graph_context: Dict[str, Any], 
                         vector_context: List[Document]) -> List[Dict[str, Any]]:
@@ -379,6 +721,3 @@ class GraphRAGPipeline:
             })
         
         return sources
-
-# Global instance
-graph_rag_pipeline = GraphRAGPipeline() 
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Graph Service
+Graph database access layer for the aviation knowledge graph
+"""
+
+from typing import List, Dict, Any, Protocol
+
+import structlog
+from neo4j import AsyncGraphDatabase
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+class GraphNode(dict):
+    """Backend-neutral node: a property dict with Neo4j-style `element_id`/`labels`"""
+
+    def __init__(self, element_id: str, labels: List[str], properties: Dict[str, Any]):
+        super().__init__(properties)
+        self.element_id = element_id
+        self.labels = labels
+
+class GraphRelationship(dict):
+    """Backend-neutral relationship: a property dict with `element_id`/`type`"""
+
+    def __init__(self, element_id: str, type: str, properties: Dict[str, Any]):
+        super().__init__(properties)
+        self.element_id = element_id
+        self.type = type
+
+class GraphBackend(Protocol):
+    """Cypher-speaking graph store"""
+
+    async def execute_query(self, cypher: str, params: Dict[str, Any] = None) -> List[Any]: ...
+
+    async def create_indexes(self): ...
+
+    async def health_check(self) -> Dict[str, Any]: ...
+
+    async def close(self): ...
+
+class Neo4jBackend:
+    """Async Neo4j backend (system of record)"""
+
+    # Lookup properties used by the pipeline's UNWIND ... MATCH queries
+    INDEXES = [
+        "CREATE INDEX flight_number IF NOT EXISTS FOR (f:Flight) ON (f.flight_number)",
+        "CREATE INDEX equipment_id IF NOT EXISTS FOR (e:Equipment) ON (e.equipment_id)",
+        "CREATE INDEX safety_protocol_name IF NOT EXISTS FOR (sp:SafetyProtocol) ON (sp.name)",
+    ]
+
+    def __init__(self):
+        self.driver = AsyncGraphDatabase.driver(
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+            max_connection_pool_size=50,
+            connection_acquisition_timeout=30
+        )
+        self.database = "neo4j"
+
+    async def execute_query(self, cypher: str, params: Dict[str, Any] = None) -> List[Any]:
+        """Run a parameterized Cypher query and return its records"""
+        async with self.driver.session(database=self.database) as session:
+            result = await session.run(cypher, params or {})
+            # Records keep Node/Relationship values intact for result processing
+            return [record async for record in result]
+
+    async def create_indexes(self):
+        """Create the indexes backing the pipeline's lookup queries"""
+        async with self.driver.session(database=self.database) as session:
+            for statement in self.INDEXES:
+                await session.run(statement)
+        logger.info("Graph indexes ensured", backend="neo4j", count=len(self.INDEXES))
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verify connectivity to Neo4j"""
+        try:
+            await self.driver.verify_connectivity()
+            return {"status": "healthy"}
+        except Exception as e:
+            logger.error("Graph health check failed", backend="neo4j", error=str(e))
+            return {"status": "unhealthy", "error": str(e)}
+
+    async def close(self):
+        """Close the Neo4j driver"""
+        await self.driver.close()
+
+class FalkorDBBackend:
+    """In-process-latency FalkorDB backend for read-only replicas"""
+
+    INDEXES = [
+        "CREATE INDEX FOR (f:Flight) ON (f.flight_number)",
+        "CREATE INDEX FOR (e:Equipment) ON (e.equipment_id)",
+        "CREATE INDEX FOR (sp:SafetyProtocol) ON (sp.name)",
+    ]
+
+    def __init__(self):
+        from falkordb.asyncio import FalkorDB
+
+        self.db = FalkorDB(
+            host=getattr(settings, "FALKORDB_HOST", "localhost"),
+            port=getattr(settings, "FALKORDB_PORT", 6379)
+        )
+        self.graph = self.db.select_graph(getattr(settings, "FALKORDB_GRAPH", "aviation"))
+
+    async def execute_query(self, cypher: str, params: Dict[str, Any] = None) -> List[Any]:
+        """Run a read-only Cypher query and return rows keyed by column"""
+        from falkordb import Node, Edge
+
+        result = await self.graph.ro_query(cypher, params or {})
+        columns = [column[1] for column in result.header]
+
+        def convert(value: Any) -> Any:
+            if isinstance(value, Node):
+                return GraphNode(str(value.id), list(value.labels), value.properties)
+            if isinstance(value, Edge):
+                return GraphRelationship(str(value.id), value.relation, value.properties)
+            return value
+
+        return [dict(zip(columns, map(convert, row))) for row in result.result_set]
+
+    async def create_indexes(self):
+        """Create the lookup indexes (FalkorDB has no IF NOT EXISTS)"""
+        for statement in self.INDEXES:
+            try:
+                await self.graph.query(statement)
+            except Exception as e:
+                logger.debug("Graph index exists or failed", backend="falkordb", error=str(e))
+        logger.info("Graph indexes ensured", backend="falkordb", count=len(self.INDEXES))
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verify connectivity to FalkorDB"""
+        try:
+            await self.db.connection.ping()
+            return {"status": "healthy"}
+        except Exception as e:
+            logger.error("Graph health check failed", backend="falkordb", error=str(e))
+            return {"status": "unhealthy", "error": str(e)}
+
+    async def close(self):
+        """Close the FalkorDB connection pool"""
+        await self.db.connection.aclose()
+
+GRAPH_BACKENDS = {
+    "neo4j": Neo4jBackend,
+    "falkordb": FalkorDBBackend,
+}
+
+class GraphService:
+    """Graph client used by the Graph RAG pipeline
+
+    Queries go to the backend selected by `settings.GRAPH_BACKEND`. Neo4j stays
+    the system of record; FalkorDB is meant as a periodically snapshotted
+    read replica for the pipeline's small lookup traversals.
+    """
+
+    def __init__(self, backend: str = None):
+        self.backend_name = backend or getattr(settings, "GRAPH_BACKEND", "neo4j")
+        self.backend: GraphBackend = GRAPH_BACKENDS[self.backend_name]()
+
+    async def execute_query(self, cypher: str, params: Dict[str, Any] = None) -> List[Any]:
+        """Run a parameterized read query on the configured backend"""
+        return await self.backend.execute_query(cypher, params)
+
+    async def create_indexes(self):
+        """Create the indexes backing the pipeline's lookup queries"""
+        await self.backend.create_indexes()
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verify connectivity to the configured backend"""
+        status = await self.backend.health_check()
+        return {**status, "backend": self.backend_name}
+
+    async def close(self):
+        """Close the backend connections"""
+        await self.backend.close()
@@ -0,0 +1,111 @@
+"""
+Vector Service
+Weaviate access layer for semantic document search
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+import structlog
+import weaviate
+from langchain.schema import Document
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class VectorHits:
+    """Struct-of-arrays view of a vector search result, in rank order"""
+    ids: np.ndarray
+    scores: np.ndarray
+    texts: List[str]
+    metadatas: List[Dict[str, Any]]
+    # Set when the search could not run, as opposed to finding nothing
+    failed: bool = False
+
+    @classmethod
+    def empty(cls, failed: bool = False) -> "VectorHits":
+        return cls(
+            ids=np.empty(0, dtype=object),
+            scores=np.empty(0, dtype=np.float32),
+            texts=[],
+            metadatas=[],
+            failed=failed
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_documents(self, indices: Optional[Sequence[int]] = None) -> List[Document]:
+        """Materialize `Document` objects, only for the requested hits"""
+        if indices is None:
+            indices = range(len(self))
+        return [
+            Document(
+                page_content=self.texts[i],
+                metadata={**self.metadatas[i], "id": self.ids[i], "score": float(self.scores[i])}
+            )
+            for i in indices
+        ]
+
+class VectorService:
+    """Weaviate client used by the Graph RAG pipeline"""
+
+    PROPERTIES = ["content", "source", "intent"]
+
+    def __init__(self):
+        self.client = weaviate.Client(settings.WEAVIATE_URL)
+        self.class_name = getattr(settings, "WEAVIATE_CLASS_NAME", "AviationDocument")
+
+    async def search(self, query_embedding: List[float], k: int = 5,
+                     filter: Dict[str, Any] = None) -> VectorHits:
+        """Nearest-vector search returning scores, ids and texts as arrays"""
+        # weaviate-client v3 is synchronous; keep it off the event loop
+        response = await asyncio.to_thread(self._near_vector, query_embedding, k, filter)
+        objects = response.get("data", {}).get("Get", {}).get(self.class_name) or []
+
+        ids = np.empty(len(objects), dtype=object)
+        scores = np.empty(len(objects), dtype=np.float32)
+        texts = []
+        metadatas = []
+        for i, obj in enumerate(objects):
+            additional = obj.pop("_additional", None) or {}
+            ids[i] = additional.get("id")
+            scores[i] = additional.get("certainty") or 0.0
+            texts.append(obj.pop("content", None) or "")
+            metadatas.append(obj)
+
+        return VectorHits(ids=ids, scores=scores, texts=texts, metadatas=metadatas)
+
+    def _near_vector(self, query_embedding: List[float], k: int,
+                     filter: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        query = (
+            self.client.query
+            .get(self.class_name, self.PROPERTIES)
+            .with_near_vector({"vector": query_embedding})
+            .with_limit(k)
+            .with_additional(["id", "certainty"])
+        )
+
+        if filter:
+            operands = [
+                {"path": [key], "operator": "Equal", "valueText": value}
+                for key, value in filter.items()
+            ]
+            query = query.with_where(
+                operands[0] if len(operands) == 1 else {"operator": "And", "operands": operands}
+            )
+
+        return query.do()
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verify Weaviate readiness"""
+        try:
+            ready = await asyncio.to_thread(self.client.is_ready)
+            return {"status": "healthy" if ready else "unhealthy"}
+        except Exception as e:
+            logger.error("Vector health check failed", error=str(e))
+            return {"status": "unhealthy", "error": str(e)}
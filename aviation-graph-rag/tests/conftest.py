@@ -0,0 +1,20 @@
+"""
+Shared test setup
+Registers minimal settings when the deployment's config module is absent
+"""
+
+import sys
+import types
+
+try:
+    import src.core.config  # noqa: F401
+except ModuleNotFoundError as e:
+    if e.name != "src.core.config":
+        raise
+    config = types.ModuleType("src.core.config")
+    # Only required settings; optional ones fall back to their getattr defaults
+    config.settings = types.SimpleNamespace(
+        LLM_MODEL="gpt-4",
+        EMBEDDING_MODEL="text-embedding-ada-002",
+    )
+    sys.modules["src.core.config"] = config
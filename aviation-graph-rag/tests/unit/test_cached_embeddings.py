@@ -0,0 +1,116 @@
+"""Unit tests for the Redis-backed embedding cache"""
+
+import numpy as np
+import pytest
+
+from src.core.cache import CachedEmbeddings
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls CachedEmbeddings makes"""
+
+    def __init__(self, fail=False):
+        self.store = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+
+
+class RecordingEmbeddings:
+    """Embeddings double returning [len(text), 1.0] and recording upstream calls"""
+
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    @staticmethod
+    def _vector(text):
+        return [float(len(text)), 1.0]
+
+    async def aembed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text):
+        self.query_calls.append(text)
+        return self._vector(text)
+
+
+def make_cache(redis=None):
+    upstream = RecordingEmbeddings()
+    return CachedEmbeddings(upstream, redis or FakeRedis(), model="test-model"), upstream
+
+
+@pytest.mark.asyncio
+async def test_only_uncached_texts_go_upstream():
+    cache, upstream = make_cache()
+    await cache.aembed_documents(["bb"])
+
+    vectors = await cache.aembed_documents(["a", "bb", "cccc"])
+
+    assert upstream.document_calls == [["bb"], ["a", "cccc"]]
+    np.testing.assert_allclose(vectors, [[1.0, 1.0], [2.0, 1.0], [4.0, 1.0]])
+
+
+@pytest.mark.asyncio
+async def test_fully_cached_batch_makes_no_upstream_call():
+    cache, upstream = make_cache()
+    await cache.aembed_documents(["a", "bb"])
+
+    vectors = await cache.aembed_documents(["bb", "a"])
+
+    assert upstream.document_calls == [["a", "bb"]]
+    np.testing.assert_allclose(vectors, [[2.0, 1.0], [1.0, 1.0]])
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_is_a_no_op():
+    cache, upstream = make_cache()
+
+    assert await cache.aembed_documents([]) == []
+    assert upstream.document_calls == []
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache():
+    cache, upstream = make_cache()
+
+    first = await cache.aembed_query("status of AA123")
+    second = await cache.aembed_query("status of AA123")
+
+    assert upstream.query_calls == ["status of AA123"]
+    np.testing.assert_allclose(second, first)
+
+
+@pytest.mark.asyncio
+async def test_vectors_are_stored_as_float16():
+    redis = FakeRedis()
+    cache, _ = make_cache(redis)
+
+    await cache.aembed_query("abc")
+
+    (payload,) = redis.store.values()
+    assert len(payload) == 2 * np.dtype(np.float16).itemsize
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_upstream():
+    cache, upstream = make_cache(FakeRedis(fail=True))
+
+    vectors = await cache.aembed_documents(["a", "bb"])
+
+    assert upstream.document_calls == [["a", "bb"]]
+    assert vectors == [[1.0, 1.0], [2.0, 1.0]]
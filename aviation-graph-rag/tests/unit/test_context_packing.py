@@ -0,0 +1,86 @@
+"""Unit tests for token-budget packing of the fused context"""
+
+import numpy as np
+import pytest
+
+from src.core import graph_rag
+from src.core.graph_rag import GraphRAGPipeline
+from src.core.vector_service import VectorHits
+
+
+class WordEncoding:
+    """Tokenizer double: one token per space-separated word"""
+
+    def encode(self, text):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(graph_rag, "_get_encoding", WordEncoding)
+    # _combine_contexts needs no services, so skip __init__
+    return object.__new__(GraphRAGPipeline)
+
+
+def set_budget(monkeypatch, tokens):
+    monkeypatch.setattr(graph_rag.settings, "CONTEXT_TOKEN_BUDGET", tokens, raising=False)
+
+
+def make_hits(texts):
+    return VectorHits(
+        ids=np.array([f"d{i}" for i in range(len(texts))], dtype=object),
+        scores=np.linspace(0.9, 0.5, len(texts)).astype(np.float32),
+        texts=texts,
+        metadatas=[{} for _ in texts]
+    )
+
+
+GRAPH_CONTEXT = {
+    "nodes": [{"id": "n0", "labels": ["Flight"], "properties": {"name": "AA123"}}]
+}
+HITS = make_hits(["alpha beta", "gamma delta", "epsilon zeta"])
+
+
+def test_everything_fits_within_a_large_budget(pipeline, monkeypatch):
+    set_budget(monkeypatch, 1000)
+
+    text, packed = pipeline._combine_contexts(GRAPH_CONTEXT, HITS, [0, 1, 2])
+
+    assert packed == [0, 1, 2]
+    assert text.startswith("Graph Information:\n- Flight: AA123")
+    assert text.endswith("- epsilon zeta")
+
+
+def test_part_crossing_the_budget_is_truncated_and_packing_stops(pipeline, monkeypatch):
+    # "\nRelated Documents:" (2) + newline, "- alpha beta" (3) + newline,
+    # leaving exactly 3 tokens for "- gamma delta"
+    set_budget(monkeypatch, 10)
+
+    text, packed = pipeline._combine_contexts({}, HITS, [0, 1, 2])
+
+    assert packed == [0, 1]
+    assert text.endswith("- gamma delta...")
+    assert "epsilon" not in text
+
+
+def test_hits_are_packed_in_the_given_order(pipeline, monkeypatch):
+    set_budget(monkeypatch, 1000)
+
+    text, packed = pipeline._combine_contexts({}, HITS, [2, 0])
+
+    assert packed == [2, 0]
+    assert "gamma" not in text
+    assert text.index("epsilon") < text.index("alpha")
+
+
+def test_graph_facts_take_the_budget_first(pipeline, monkeypatch):
+    set_budget(monkeypatch, 6)
+
+    text, packed = pipeline._combine_contexts(GRAPH_CONTEXT, HITS, [0, 1, 2])
+
+    assert packed == []
+    assert "AA123" in text
+    assert "alpha" not in text
@@ -0,0 +1,45 @@
+"""Unit tests for batched, parameterized Cypher construction"""
+
+import pytest
+
+from src.core import graph_rag
+
+
+@pytest.fixture
+def pipeline():
+    # _build_cypher_query needs no services, so skip __init__
+    return object.__new__(graph_rag.GraphRAGPipeline)
+
+
+ENTITIES = [
+    {"type": "flight_number", "value": "AA123"},
+    {"type": "flight_number", "value": "DL456"},
+    {"type": "airport_code", "value": "JFK"},
+    {"type": "equipment_id", "value": "E-4521"},
+    {"type": "safety_protocol", "value": "evacuation"},
+]
+
+
+@pytest.mark.parametrize("intent, param, values", [
+    ("flight_info", "flight_numbers", ["AA123", "DL456"]),
+    ("safety", "protocol_names", ["evacuation"]),
+    ("maintenance", "equipment_ids", ["E-4521"]),
+])
+def test_intent_queries_unwind_matching_entities(pipeline, intent, param, values):
+    cypher, params = pipeline._build_cypher_query(intent, ENTITIES)
+    assert params == {param: values}
+    assert f"UNWIND ${param}" in cypher
+
+
+def test_general_query_searches_all_entity_values(pipeline):
+    cypher, params = pipeline._build_cypher_query("general", ENTITIES)
+    assert params == {"search_terms": ["AA123", "DL456", "JFK", "E-4521", "evacuation"]}
+    assert "UNWIND $search_terms" in cypher
+
+
+def test_values_are_passed_as_parameters_not_interpolated(pipeline):
+    cypher, params = pipeline._build_cypher_query(
+        "flight_info", [{"type": "flight_number", "value": "' OR 1=1 //"}]
+    )
+    assert "OR 1=1" not in cypher
+    assert params == {"flight_numbers": ["' OR 1=1 //"]}
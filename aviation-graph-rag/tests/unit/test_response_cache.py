@@ -0,0 +1,148 @@
+"""Unit tests for the exact + semantic response cache"""
+
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.core.cache import ResponseCache, SemanticIndex, cached_response, query_identifiers
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls ResponseCache makes"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+class FakeEmbeddings:
+    """Maps each query to a fixed vector"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def aembed_query(self, text):
+        return self.vectors[text]
+
+
+class FakePipeline:
+    """Minimal object exposing what `cached_response` needs"""
+
+    def __init__(self, cache, vectors, degraded=False):
+        self.response_cache = cache
+        self.embeddings = FakeEmbeddings(vectors)
+        self.degraded = degraded
+        self.calls = []
+
+    @cached_response
+    async def process_query(self, query, user_context=None):
+        self.calls.append(query)
+        return SimpleNamespace(answer=f"answer to {query}",
+                               metadata={"degraded": self.degraded})
+
+
+def make_cache(max_entries=10):
+    cache = ResponseCache.__new__(ResponseCache)
+    cache.redis = FakeRedis()
+    cache.ttl = 60
+    cache.similarity_threshold = 0.95
+    cache.index = SemanticIndex(max_entries)
+    return cache
+
+
+VECTORS = {
+    "Is flight AA123 delayed?": [1.0, 0.0, 0.0],
+    "is flight AA123 running late?": [0.99, 0.05, 0.0],
+    "Is flight DL456 delayed?": [1.0, 0.01, 0.0],
+    "What is the baggage allowance?": [0.0, 1.0, 0.0],
+}
+
+
+def test_query_identifiers():
+    assert query_identifiers("Is flight AA123 delayed at JFK?") == {"AA123", "JFK"}
+    assert query_identifiers("What is the baggage allowance?") == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_exact_hit_skips_pipeline():
+    pipeline = FakePipeline(make_cache(), VECTORS)
+    first = await pipeline.process_query("Is flight AA123 delayed?")
+    second = await pipeline.process_query("  is FLIGHT aa123   delayed?")
+    assert pipeline.calls == ["Is flight AA123 delayed?"]
+    assert second.answer == first.answer
+
+
+@pytest.mark.asyncio
+async def test_semantic_hit_for_paraphrase():
+    pipeline = FakePipeline(make_cache(), VECTORS)
+    await pipeline.process_query("Is flight AA123 delayed?")
+    response = await pipeline.process_query("is flight AA123 running late?")
+    assert pipeline.calls == ["Is flight AA123 delayed?"]
+    assert response.answer == "answer to Is flight AA123 delayed?"
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_requires_same_identifiers():
+    pipeline = FakePipeline(make_cache(), VECTORS)
+    await pipeline.process_query("Is flight AA123 delayed?")
+    response = await pipeline.process_query("Is flight DL456 delayed?")
+    assert response.answer == "answer to Is flight DL456 delayed?"
+    assert len(pipeline.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_is_scoped_per_user():
+    pipeline = FakePipeline(make_cache(), VECTORS)
+    await pipeline.process_query("Is flight AA123 delayed?", {"user_id": "alice"})
+    await pipeline.process_query("is flight AA123 running late?", {"user_id": "bob"})
+    assert len(pipeline.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_degraded_response_is_not_cached():
+    cache = make_cache()
+    pipeline = FakePipeline(cache, VECTORS, degraded=True)
+    await pipeline.process_query("Is flight AA123 delayed?")
+    await pipeline.process_query("Is flight AA123 delayed?")
+    assert len(pipeline.calls) == 2
+    assert cache.redis.store == {}
+    assert len(cache.index) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_response_is_dropped_from_index():
+    cache = make_cache()
+    pipeline = FakePipeline(cache, VECTORS)
+    await pipeline.process_query("Is flight AA123 delayed?")
+    cache.redis.store.clear()
+
+    assert await cache.get_semantic("Is flight AA123 delayed?", VECTORS["Is flight AA123 delayed?"],
+                                    "global") is None
+    assert cache.index.search(np.array([1.0, 0.0, 0.0], dtype=np.float32),
+                              SemanticIndex.partition("global", frozenset({"AA123"})), 0.95) is None
+
+
+def test_index_evicts_oldest_entry_when_full():
+    index = SemanticIndex(max_entries=2)
+    vectors = np.eye(3, dtype=np.float32)
+    for i in range(3):
+        index.add(vectors[i], f"key-{i}", "global")
+
+    assert len(index) == 2
+    assert index.search(vectors[0], "global", 0.95) is None
+    assert index.key(index.search(vectors[2], "global", 0.95)) == "key-2"
+
+
+@pytest.mark.asyncio
+async def test_cached_payload_round_trips():
+    cache = make_cache()
+    await cache.set("key", "What is the baggage allowance?", "global", {"answer": "23kg"})
+    assert pickle.loads(cache.redis.store["rag:response:key"]) == {"answer": "23kg"}
+    assert await cache.get_exact("key") == {"answer": "23kg"}
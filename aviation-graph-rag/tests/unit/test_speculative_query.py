@@ -0,0 +1,110 @@
+"""Unit tests for accepting or regenerating the speculative answer"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.core import graph_rag
+from src.core.graph_rag import EMPTY_GRAPH_CONTEXT, GraphRAGPipeline
+from src.core.vector_service import VectorHits
+
+
+class WordEncoding:
+    """Tokenizer double: one token per space-separated word"""
+
+    def encode(self, text):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def make_hits(count):
+    return VectorHits(
+        ids=np.array([f"d{i}" for i in range(count)], dtype=object),
+        scores=np.full(count, 0.8, dtype=np.float32),
+        texts=[f"document {i}" for i in range(count)],
+        metadatas=[{} for _ in range(count)]
+    )
+
+
+def graph_context(node_count, failed=False):
+    nodes = [
+        {"id": f"n{i}", "labels": ["Flight"], "properties": {"name": f"AA{i}"}}
+        for i in range(node_count)
+    ]
+    context = {**EMPTY_GRAPH_CONTEXT, "nodes": nodes}
+    if failed:
+        context["failed"] = True
+    return context
+
+
+class SpeculativePipeline(GraphRAGPipeline):
+    """Pipeline with retrieval and generation replaced by canned results"""
+
+    def __init__(self, graph, hits):
+        # Services are not needed, so the base __init__ is skipped
+        self.graph = graph
+        self.hits = hits
+        self.generated = []
+
+    async def _analyze_query(self, query):
+        return np.ones(2, dtype=np.float32), "flight_info", []
+
+    async def _traverse_graph(self, query, intent, entities):
+        await asyncio.sleep(0)
+        return self.graph
+
+    async def _search_vector(self, query_embedding, intent):
+        return self.hits
+
+    async def _generate_response(self, query, fused_context, user_context=None):
+        label = "full" if fused_context["graph_nodes"] else "prelim"
+        self.generated.append(label)
+        return f"{label} answer"
+
+
+@pytest.fixture(autouse=True)
+def word_encoding(monkeypatch):
+    monkeypatch.setattr(graph_rag, "_get_encoding", WordEncoding)
+
+
+@pytest.mark.asyncio
+async def test_preliminary_answer_kept_when_graph_adds_little():
+    pipeline = SpeculativePipeline(graph_context(1), make_hits(3))
+
+    _, _, graph, vector_context, fused, response = await pipeline._speculative_query("AA0?")
+
+    assert response == "prelim answer"
+    assert pipeline.generated == ["prelim"]
+    # Sources describe the context the answer was generated from
+    assert graph["nodes"] == []
+    assert fused["graph_nodes"] == []
+    assert len(vector_context) == 3
+
+
+@pytest.mark.asyncio
+async def test_answer_regenerated_when_graph_adds_several_nodes():
+    pipeline = SpeculativePipeline(graph_context(3), make_hits(3))
+
+    _, _, graph, _, fused, response = await pipeline._speculative_query("AA0?")
+
+    assert response == "full answer"
+    assert len(graph["nodes"]) == 3
+    assert len(fused["graph_nodes"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_accepted_answer_keeps_graph_failure_flag():
+    pipeline = SpeculativePipeline(graph_context(0, failed=True), make_hits(2))
+
+    _, _, _, _, fused, response = await pipeline._speculative_query("AA0?")
+
+    assert response == "prelim answer"
+    assert fused["degraded"]
+
+
+def test_jaccard():
+    assert graph_rag._jaccard(set(), set()) == 1.0
+    assert graph_rag._jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
@@ -0,0 +1,47 @@
+"""Unit tests for the struct-of-arrays vector search result"""
+
+import numpy as np
+
+from src.core.vector_service import VectorHits
+
+
+def make_hits():
+    return VectorHits(
+        ids=np.array(["d0", "d1", "d2"], dtype=object),
+        scores=np.array([0.9, 0.8, 0.7], dtype=np.float32),
+        texts=["first", "second", "third"],
+        metadatas=[{"source": "a"}, {"source": "b"}, {"source": "c"}]
+    )
+
+
+def test_empty_hits():
+    hits = VectorHits.empty()
+
+    assert len(hits) == 0
+    assert hits.to_documents() == []
+    assert not hits.failed
+    assert VectorHits.empty(failed=True).failed
+
+
+def test_to_documents_materializes_all_hits_by_default():
+    documents = make_hits().to_documents()
+
+    assert [doc.page_content for doc in documents] == ["first", "second", "third"]
+
+
+def test_to_documents_only_materializes_requested_hits():
+    documents = make_hits().to_documents([2, 0])
+
+    assert [doc.page_content for doc in documents] == ["third", "first"]
+    assert documents[0].metadata["source"] == "c"
+    assert documents[0].metadata["id"] == "d2"
+    assert isinstance(documents[0].metadata["score"], float)
+    assert abs(documents[0].metadata["score"] - 0.7) < 1e-6
+
+
+def test_to_documents_does_not_mutate_hit_metadata():
+    hits = make_hits()
+
+    hits.to_documents([0])
+
+    assert hits.metadatas[0] == {"source": "a"}
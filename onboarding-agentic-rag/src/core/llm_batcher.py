@@ -0,0 +1,83 @@
+"""
+LLM Batcher
+Coalesces concurrent LLM invocations into micro-batches
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class LLMBatcher:
+    """Micro-batches `submit` calls across requests into `runnable.abatch`
+
+    Requests arriving within `max_wait_ms` of the first queued one (up to
+    `max_batch` of them) are sent together, which lets batching-capable
+    backends (e.g. vLLM continuous batching) serve them in one pass.
+    """
+
+    def __init__(self, runnable, max_batch: int = 16, max_wait_ms: float = 10):
+        self.runnable = runnable
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, payload: Dict[str, Any]) -> Any:
+        """Queue a payload and wait for its result"""
+        # Started lazily: the batcher is built before an event loop is running
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _collect(self):
+        """Gather queued payloads into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without blocking collection of the next batch
+            task = asyncio.create_task(self._execute(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _execute(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Run one batch and resolve each caller's future"""
+        pending = [(payload, future) for payload, future in batch if not future.cancelled()]
+        if not pending:
+            return
+
+        try:
+            results = await self.runnable.abatch(
+                [payload for payload, _ in pending],
+                return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * len(pending)
+
+        logger.debug("LLM batch executed", batch_size=len(pending))
+
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
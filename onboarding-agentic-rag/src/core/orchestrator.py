@@ -4,28 +4,80 @@ Coordinates multiple agents and manages response synthesis for Agentic RAG
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import heapq
+import json
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from dataclasses import dataclass, field
+import httpx
 import structlog
 import time
+from openai import AsyncOpenAI
+from pydantic import BaseModel, field_validator
 
 from langchain.schema import Document
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.utils.json import parse_json_markdown
+from langchain.schema.messages import SystemMessage
 
 from ..agents.base_agent import AgentContext, AgentResponse, agent_registry
 from ..core.vector_service import VectorService
+from ..core.routing_cache import RoutingCache
+from ..core.llm_batcher import LLMBatcher
 from ..core.config import settings
 
 logger = structlog.get_logger(__name__)
 
-@dataclass
+# Shared keep-alive HTTP/2 pool for all LLM traffic from this process
+shared_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    timeout=30
+)
+
+# Caps concurrent agent executions across all orchestrations
+agent_semaphore = asyncio.Semaphore(getattr(settings, "AGENT_MAX_PARALLEL", 16))
+
+# A single agent response is used as-is when it is this confident...
+DOMINANT_CONFIDENCE = 0.9
+# ...and leads the next most confident response by at least this margin
+DOMINANT_MARGIN = 0.3
+
+class QualitySchema(BaseModel):
+    """Per-criterion quality scores the LLM assigns to a response"""
+    completeness: float
+    accuracy: float
+    relevance: float
+    clarity: float
+    
+    @field_validator("completeness", "accuracy", "relevance", "clarity")
+    @classmethod
+    def _clamp(cls, score: float) -> float:
+        # Out-of-range scores (e.g. on a 0-10 scale) are clamped, not rejected
+        return min(1.0, max(0.0, score))
+
+class SynthesisSchema(QualitySchema):
+    """Synthesized response together with its quality scores"""
+    response: str
+
+# Relative weight of each quality criterion in the overall confidence
+QUALITY_WEIGHTS = {
+    "completeness": 1.0,
+    "accuracy": 1.0,
+    "relevance": 1.0,
+    "clarity": 1.0,
+}
+
+@dataclass(slots=True, frozen=True)
 class OrchestrationResult:
     """Result from agent orchestration"""
     final_response: str
     agent_responses: List[AgentResponse]
-    confidence: float
+    confidence: Optional[float]
     sources: List[Document]
     metadata: Dict[str, Any]
     processing_time: float
@@ -35,34 +87,61 @@ class AgentOrchestrator:
     """Orchestrates multiple agents for complex query processing"""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.LLM_MODEL,
-            temperature=0.1,
-            max_tokens=1500
+        self.provider = getattr(settings, "LLM_PROVIDER", "openai")
+        if self.provider == "anthropic":
+            # Optional dependency, only needed for this provider
+            from langchain_anthropic import ChatAnthropic
+            
+            self.llm = ChatAnthropic(
+                model=settings.LLM_MODEL,
+                temperature=0.1,
+                max_tokens=1500,
+                # cache_control blocks are only honoured with the prompt-caching beta
+                default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+            )
+        else:
+            self.llm = ChatOpenAI(
+                model=settings.LLM_MODEL,
+                temperature=0.1,
+                max_tokens=1500,
+                # The shared pool can only be wired in through a prebuilt OpenAI client
+                async_client=AsyncOpenAI(http_client=shared_http_client).chat.completions
+            )
+        # JSON mode for the structured (synthesis/quality) chains; Anthropic has none
+        self.json_llm = (
+            self.llm if self.provider == "anthropic"
+            else self.llm.bind(response_format={"type": "json_object"})
         )
         self.vector_service = VectorService()
+        # Bound once; hot-path events are rendered off the event loop via a*() methods
+        self._log = logger.bind(component="orchestrator")
+        self.routing_cache = RoutingCache(threshold=0.85)
         
         # Setup response synthesis prompt
         self._setup_prompts()
         
+        # Cross-request micro-batching of synthesis calls
+        self.synthesis_batcher = (
+            LLMBatcher(self.synthesis_chain, max_batch=16, max_wait_ms=10)
+            if getattr(settings, "LLM_BATCHING", False) else None
+        )
+        
         # Orchestration metrics
         self.total_orchestrations = 0
         self.successful_orchestrations = 0
-        self.average_processing_time = 0.0
+        # Integer nanosecond accumulator; the average is derived on read
+        self.total_processing_time_ns = 0
+        self.timed_orchestrations = 0
     
     def _setup_prompts(self):
-        """Setup prompt templates for orchestration"""
-        
-        # Response synthesis prompt
-        self.synthesis_prompt = ChatPromptTemplate.from_template("""
-        You are an intelligent assistant coordinating multiple specialized agents to provide comprehensive answers.
+        """Setup prompt templates for orchestration
         
-        User Query: {query}
+        Static instructions live in the system message and all interpolated
+        values in the human message, so every call shares a cacheable prefix.
+        """
         
-        Agent Responses:
-        {agent_responses}
-        
-        User Context: {user_context}
+        synthesis_instructions = """
+        You are an intelligent assistant coordinating multiple specialized agents to provide comprehensive answers.
         
         Instructions:
         1. Synthesize a comprehensive response that addresses all aspects of the query
@@ -71,37 +150,90 @@ class AgentOrchestrator:
         4. Include relevant information from all contributing agents
         5. Ensure the response is personalized to the user's context
         6. Provide actionable next steps when appropriate
+        """
         
-        Synthesized Response:
-        """)
-        
-        # Quality assessment prompt
-        self.quality_prompt = ChatPromptTemplate.from_template("""
-        Assess the quality of the synthesized response:
-        
-        Query: {query}
-        Response: {response}
-        Agent Contributions: {agent_contributions}
-        
+        quality_rubric = """
         Rate the response on a scale of 0.0 to 1.0 for:
         - Completeness: Does it address all aspects of the query?
         - Accuracy: Is the information correct and up-to-date?
         - Relevance: Is it relevant to the user's context?
         - Clarity: Is it clear and well-structured?
+        """
+        
+        synthesis_inputs = ("human", """
+        User Query: {query}
         
-        Return only the average score (0.0-1.0).
+        Agent Responses:
+        {agent_responses}
+        
+        User Context: {user_context}
         """)
+        
+        # Response synthesis + quality assessment prompt (single LLM call)
+        self.synthesis_prompt = ChatPromptTemplate.from_messages([
+            self._system_message(synthesis_instructions + """
+        Then assess the quality of your synthesized response.
+        """ + quality_rubric + """
+        Respond with a JSON object of the form:
+        {"response": "<synthesized response>", "completeness": <0.0-1.0>,
+         "accuracy": <0.0-1.0>, "relevance": <0.0-1.0>, "clarity": <0.0-1.0>}
+        """),
+            synthesis_inputs
+        ])
+        
+        # Plain-text synthesis prompt for streaming
+        self.stream_synthesis_prompt = ChatPromptTemplate.from_messages([
+            self._system_message(synthesis_instructions + """
+        Respond with the synthesized response only.
+        """),
+            synthesis_inputs
+        ])
+        
+        # Quality assessment prompt for streamed responses
+        self.quality_prompt = ChatPromptTemplate.from_messages([
+            self._system_message("""
+        Assess the quality of the synthesized response you are given.
+        """ + quality_rubric + """
+        Respond with a JSON object of the form:
+        {"completeness": <0.0-1.0>, "accuracy": <0.0-1.0>,
+         "relevance": <0.0-1.0>, "clarity": <0.0-1.0>}
+        """),
+            ("human", """
+        Query: {query}
+        Response: {response}
+        Agent Contributions: {agent_contributions}
+        """)
+        ])
+        
+        # Chains are composed once and reused across calls
+        self.synthesis_chain = (self.synthesis_prompt | self.json_llm
+                                | PydanticOutputParser(pydantic_object=SynthesisSchema))
+        self.stream_synthesis_chain = self.stream_synthesis_prompt | self.llm | StrOutputParser()
+        self.quality_chain = (self.quality_prompt | self.json_llm
+                              | PydanticOutputParser(pydantic_object=QualitySchema))
+    
+    def _system_message(self, text: str) -> SystemMessage:
+        """Static system prompt, marked for provider-side prompt caching"""
+        if self.provider == "anthropic":
+            return SystemMessage(content=[{
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral"}
+            }])
+        
+        # OpenAI caches stable prefixes automatically
+        return SystemMessage(content=text)
     
     async def orchestrate_query(self, context: AgentContext) -> OrchestrationResult:
         """Orchestrate multiple agents to process a query"""
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         self.total_orchestrations += 1
         
         try:
-            logger.info("Starting query orchestration", 
-                       query=context.query,
-                       user_id=context.user_id)
+            await self._log.ainfo("Starting query orchestration", 
+                                  query=context.query,
+                                  user_id=context.user_id)
             
             # Step 1: Route query to appropriate agents
             agent_assignments = await self._route_to_agents(context)
@@ -109,28 +241,23 @@ class AgentOrchestrator:
             # Step 2: Execute agents in parallel
             agent_responses = await self._execute_agents(agent_assignments, context)
             
-            # Step 3: Synthesize responses
-            final_response = await self._synthesize_responses(
+            # Steps 3-4: Synthesize responses and assess quality (single LLM call)
+            final_response, confidence, quality_metadata = await self._synthesize_responses(
                 context.query, 
                 agent_responses, 
                 context
             )
             
-            # Step 4: Assess quality
-            confidence = await self._assess_quality(
-                context.query, 
-                final_response, 
-                agent_responses
-            )
-            
             # Step 5: Extract sources
             sources = self._extract_sources(agent_responses)
             
             # Step 6: Generate metadata
             metadata = self._generate_metadata(agent_responses, context)
+            metadata.update(quality_metadata)
             
-            processing_time = time.time() - start_time
-            self._update_metrics(processing_time, True)
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            processing_time = elapsed_ns / 1e9
+            self._update_metrics(elapsed_ns, True)
             
             result = OrchestrationResult(
                 final_response=final_response,
@@ -143,18 +270,19 @@ class AgentOrchestrator:
                               for resp in agent_responses]
             )
             
-            logger.info("Orchestration completed",
-                       processing_time=processing_time,
-                       agent_count=len(agent_responses),
-                       confidence=confidence)
+            await self._log.ainfo("Orchestration completed",
+                                  processing_time=processing_time,
+                                  agent_count=len(agent_responses),
+                                  confidence=confidence)
             
             return result
             
         except Exception as e:
-            processing_time = time.time() - start_time
-            self._update_metrics(processing_time, False)
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            processing_time = elapsed_ns / 1e9
+            self._update_metrics(elapsed_ns, False)
             
-            logger.error("Orchestration failed", error=str(e))
+            await self._log.aerror("Orchestration failed", error=str(e))
             
             # Return error result
             return OrchestrationResult(
@@ -167,29 +295,150 @@ class AgentOrchestrator:
                 agent_sequence=[]
             )
     
+    async def orchestrate_query_stream(self, context: AgentContext) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming variant of `orchestrate_query`
+        
+        Yields ("token", text) events as the synthesized response is generated,
+        followed by a single ("metadata", dict) trailer carrying confidence,
+        sources and orchestration metadata.
+        """
+        
+        start_ns = time.perf_counter_ns()
+        self.total_orchestrations += 1
+        
+        try:
+            await self._log.ainfo("Starting streaming orchestration", 
+                                  query=context.query,
+                                  user_id=context.user_id)
+            
+            agent_assignments = await self._route_to_agents(context)
+            agent_responses = await self._execute_agents(agent_assignments, context)
+            
+            direct = self._direct_response(agent_responses)
+            quality_metadata = {}
+            if direct is not None:
+                final_response, confidence = direct
+                yield "token", final_response
+            else:
+                chunks = []
+                async for chunk in self.stream_synthesis_chain.astream({
+                    "query": context.query,
+                    "agent_responses": self._format_agent_responses(agent_responses),
+                    "user_context": self._user_profile_text(context)
+                }):
+                    chunks.append(chunk)
+                    yield "token", chunk
+                
+                final_response = "".join(chunks)
+                confidence, quality_metadata = await self._assess_streamed_quality(
+                    context.query, final_response, agent_responses
+                )
+            
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            self._update_metrics(elapsed_ns, True)
+            
+            metadata = self._generate_metadata(agent_responses, context)
+            metadata.update(quality_metadata)
+            
+            yield "metadata", {
+                "confidence": confidence,
+                "sources": self._extract_sources(agent_responses),
+                "metadata": metadata,
+                "processing_time": elapsed_ns / 1e9,
+                "agent_sequence": [resp.metadata.get("agent_role", "unknown") 
+                                   for resp in agent_responses]
+            }
+            
+        except Exception as e:
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            self._update_metrics(elapsed_ns, False)
+            
+            await self._log.aerror("Streaming orchestration failed", error=str(e))
+            
+            yield "token", f"I encountered an error while processing your request: {str(e)}"
+            yield "metadata", {
+                "confidence": 0.0,
+                "sources": [],
+                "metadata": {"error": str(e)},
+                "processing_time": elapsed_ns / 1e9,
+                "agent_sequence": []
+            }
+    
+    async def embed_once(self, context: AgentContext, text: str) -> Any:
+        """Embed `text` at most once per turn
+        
+        Vectors are memoized on `context.embeddings`, so routing and agents
+        embedding the same text (usually `context.query`) share one call.
+        """
+        embeddings = getattr(context, "embeddings", None)
+        if embeddings is None:
+            embeddings = {}
+            try:
+                context.embeddings = embeddings
+            except AttributeError:
+                pass  # Slotted/frozen contexts just re-embed
+        
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        vector = embeddings.get(key)
+        if vector is None:
+            vector = await self.vector_service.embed(text)
+            embeddings[key] = vector
+        return vector
+    
     async def _route_to_agents(self, context: AgentContext) -> List[Tuple[Any, float]]:
-        """Route query to appropriate agents with priorities"""
-        return await agent_registry.route_query(context.query, context)
+        """Route query to appropriate agents with priorities
+        
+        Near-duplicate queries from users with the same profile reuse a
+        cached routing decision instead of asking the registry again.
+        """
+        try:
+            query_vector = await self.embed_once(context, context.query)
+        except Exception as e:
+            logger.warning("Routing cache embedding failed", error=str(e))
+            return await agent_registry.route_query(context.query, context)
+        
+        # The registry routes on the profile too, so decisions are scoped by it
+        profile = self._user_profile_text(context)
+        scope = hashlib.blake2b(profile.encode(), digest_size=16).digest()
+        cached = self.routing_cache.get(query_vector, scope)
+        if cached is not None:
+            assignments = [(agent_registry.get(role), priority) for role, priority in cached]
+            if all(agent is not None for agent, _ in assignments):
+                logger.info("Routing cache hit", agents=[role for role, _ in cached])
+                return assignments
+        
+        assignments = await agent_registry.route_query(context.query, context)
+        self.routing_cache.put(query_vector, [(agent.role, priority) for agent, priority in assignments],
+                               scope)
+        return assignments
     
     async def _execute_agents(self, agent_assignments: List[Tuple[Any, float]], 
                              context: AgentContext) -> List[AgentResponse]:
         """Execute agents in parallel"""
         
         # Create tasks for parallel execution
-        tasks = []
-        for agent, priority in agent_assignments:
-            task = asyncio.create_task(agent.execute(context))
-            tasks.append((task, priority))
+        tasks = [
+            (agent, priority, asyncio.create_task(self._run_agent(agent, context), name=agent.role))
+            for agent, priority in agent_assignments
+        ]
         
-        # Execute all tasks
-        results = await asyncio.gather(*[task for task, _ in tasks])
+        # Execute all tasks; one failing agent must not discard the others
+        results = await asyncio.gather(*[task for _, _, task in tasks], return_exceptions=True)
         
         # Filter out failed responses and sort by priority
         successful_responses = []
-        for (task, priority), response in zip(tasks, results):
+        for (agent, priority, _), response in zip(tasks, results):
+            if isinstance(response, asyncio.TimeoutError):
+                logger.warning("Agent execution timed out", agent_role=agent.role,
+                              timeout=getattr(settings, "AGENT_TIMEOUT_S", 30))
+                continue
+            # BaseException: a cancelled agent comes back as CancelledError
+            if isinstance(response, BaseException):
+                logger.error("Agent execution failed", agent_role=agent.role, error=repr(response))
+                continue
             if response.confidence > 0.0:  # Filter out error responses
                 response.metadata["priority"] = priority
-                response.metadata["agent_role"] = task.get_name() if hasattr(task, 'get_name') else "unknown"
+                response.metadata["agent_role"] = agent.role
                 successful_responses.append(response)
         
         # Sort by priority (highest first)
@@ -201,17 +450,82 @@ class AgentOrchestrator:
         
         return successful_responses
     
+    async def _run_agent(self, agent: Any, context: AgentContext) -> AgentResponse:
+        """Execute one agent within the process-wide concurrency cap and timeout"""
+        # The timeout also covers waiting for a semaphore slot
+        async with asyncio.timeout(getattr(settings, "AGENT_TIMEOUT_S", 30)):
+            async with agent_semaphore:
+                return await agent.execute(context)
+    
     async def _synthesize_responses(self, query: str, agent_responses: List[AgentResponse], 
-                                   context: AgentContext) -> str:
-        """Synthesize multiple agent responses into a coherent response"""
+                                   context: AgentContext) -> Tuple[str, Optional[float], Dict[str, Any]]:
+        """Synthesize multiple agent responses and assess the result
+        
+        Returns the synthesized response, its overall quality score and
+        quality metadata: the per-criterion scores under "quality", or the
+        parse failure under "quality_error" (score None).
+        """
+        
+        direct = self._direct_response(agent_responses)
+        if direct is not None:
+            return (*direct, {})
+        
+        # Synthesize and self-assess using LLM
+        payload = {
+            "query": query,
+            "agent_responses": self._format_agent_responses(agent_responses),
+            "user_context": self._user_profile_text(context)
+        }
+        
+        try:
+            if self.synthesis_batcher is not None:
+                synthesis_result = await self.synthesis_batcher.submit(payload)
+            else:
+                synthesis_result = await self.synthesis_chain.ainvoke(payload)
+        except OutputParserException as e:
+            # e.g. JSON cut off at max_tokens: keep the text, drop the score
+            logger.warning("Synthesis output not parseable", error=str(e))
+            return self._salvage_response(e), None, {"quality_error": "unparseable synthesis output"}
+        
+        quality = synthesis_result.model_dump(include=set(QUALITY_WEIGHTS))
+        return synthesis_result.response, self._assess_quality(quality), {"quality": quality}
+    
+    @staticmethod
+    def _salvage_response(error: OutputParserException) -> str:
+        """Recover the response text from a synthesis the parser rejected"""
+        raw = error.llm_output or ""
+        try:
+            # Tolerates unterminated strings and missing closing braces
+            partial = parse_json_markdown(raw)
+        except ValueError:
+            partial = None
+        if isinstance(partial, dict) and isinstance(partial.get("response"), str):
+            return partial["response"]
+        return raw
+    
+    def _direct_response(self, agent_responses: List[AgentResponse]) -> Optional[Tuple[str, float]]:
+        """Return (response, confidence) when no LLM synthesis is needed"""
         
         if not agent_responses:
-            return "I'm unable to provide a comprehensive answer at this time."
+            return "I'm unable to provide a comprehensive answer at this time.", 0.0
         
         if len(agent_responses) == 1:
-            return agent_responses[0].content
-        
-        # Format agent responses for synthesis
+            return agent_responses[0].content, agent_responses[0].confidence
+        
+        # Skip synthesis when one agent clearly dominates the others
+        top, runner_up = heapq.nlargest(2, agent_responses, key=lambda r: r.confidence)
+        if (top.confidence >= DOMINANT_CONFIDENCE
+                and top.confidence - runner_up.confidence >= DOMINANT_MARGIN):
+            logger.info("Dominant agent response, skipping synthesis",
+                       agent_role=top.metadata.get("agent_role", "unknown"),
+                       confidence=top.confidence)
+            return top.content, top.confidence
+        
+        return None
+    
+    @staticmethod
+    def _format_agent_responses(agent_responses: List[AgentResponse]) -> str:
+        """Format agent responses for synthesis"""
         agent_responses_text = []
         for i, response in enumerate(agent_responses):
             agent_responses_text.append(
@@ -219,99 +533,109 @@ class AgentOrchestrator:
                 f"Confidence: {response.confidence:.2f}\n"
                 f"Response: {response.content}\n"
             )
-        
-        # Synthesize using LLM
-        chain = self.synthesis_prompt | self.llm | StrOutputParser()
-        
-        synthesis_result = await chain.ainvoke({
-            "query": query,
-            "agent_responses": "\n\n".join(agent_responses_text),
-            "user_context": str(context.user_profile)
-        })
-        
-        return synthesis_result
+        return "\n\n".join(agent_responses_text)
     
-    async def _assess_quality(self, query: str, response: str, 
-                             agent_responses: List[AgentResponse]) -> float:
-        """Assess the quality of the synthesized response"""
-        
-        if not agent_responses:
-            return 0.0
-        
-        # Format agent contributions for quality assessment
-        agent_contributions = []
-        for response in agent_responses:
-            agent_contributions.append(
-                f"Agent: {response.metadata.get('agent_role', 'unknown')}, "
-                f"Confidence: {response.confidence:.2f}"
-            )
-        
-        # Assess quality using LLM
-        chain = self.quality_prompt | self.llm | StrOutputParser()
+    @staticmethod
+    def _user_profile_text(context: AgentContext) -> str:
+        """Canonical JSON form of the user profile, computed once per context
+        
+        Sorted keys keep the prompt text byte-identical across calls, which
+        provider-side prefix caching relies on.
+        """
+        text = getattr(context, "user_profile_text", None)
+        if text is None:
+            text = json.dumps(context.user_profile, sort_keys=True,
+                              separators=(",", ":"), default=str)
+            try:
+                context.user_profile_text = text
+            except AttributeError:
+                pass  # Slotted/frozen contexts just recompute
+        return text
+    
+    async def _assess_streamed_quality(self, query: str, response: str, 
+                                      agent_responses: List[AgentResponse]
+                                      ) -> Tuple[Optional[float], Dict[str, Any]]:
+        """Assess a streamed response once it has been fully generated
+        
+        The response has already been sent, so a failed assessment is
+        reported as a missing score rather than failing the stream.
+        """
+        agent_contributions = "\n".join(
+            f"Agent: {resp.metadata.get('agent_role', 'unknown')}, "
+            f"Confidence: {resp.confidence:.2f}"
+            for resp in agent_responses
+        )
         
         try:
-            quality_score = await chain.ainvoke({
+            quality_result = await self.quality_chain.ainvoke({
                 "query": query,
                 "response": response,
-                "agent_contributions": "\n".join(agent_contributions)
+                "agent_contributions": agent_contributions
             })
-            
-            # Parse score (expecting a float)
-            try:
-                return float(quality_score.strip())
-            except ValueError:
-                return 0.5  # Default score if parsing fails
-                
         except Exception as e:
             logger.error("Quality assessment failed", error=str(e))
-            return 0.5
+            return None, {"quality_error": "quality assessment failed"}
+        
+        quality = quality_result.model_dump()
+        return self._assess_quality(quality), {"quality": quality}
+    
+    @staticmethod
+    def _assess_quality(quality: Dict[str, float]) -> float:
+        """Weighted average of the per-criterion quality scores"""
+        weighted = sum(weight * quality[name] for name, weight in QUALITY_WEIGHTS.items())
+        return weighted / sum(QUALITY_WEIGHTS.values())
     
     def _extract_sources(self, agent_responses: List[AgentResponse]) -> List[Document]:
         """Extract and deduplicate sources from agent responses"""
-        all_sources = []
-        seen_sources = set()
+        # 16-byte BLAKE2 digest of (content, source) -> first Document seen
+        unique_sources: Dict[bytes, Document] = {}
         
         for response in agent_responses:
             for source in response.sources:
-                # Create a unique identifier for the source
-                source_id = f"{source.page_content[:100]}_{source.metadata.get('source', 'unknown')}"
-                
-                if source_id not in seen_sources:
-                    all_sources.append(source)
-                    seen_sources.add(source_id)
+                digest = hashlib.blake2b(digest_size=16)
+                digest.update(source.page_content.encode())
+                digest.update(b"\0")
+                digest.update(str(source.metadata.get('source', 'unknown')).encode())
+                unique_sources.setdefault(digest.digest(), source)
         
-        return all_sources
+        return list(unique_sources.values())
     
     def _generate_metadata(self, agent_responses: List[AgentResponse], 
                           context: AgentContext) -> Dict[str, Any]:
         """Generate comprehensive metadata for the orchestration result"""
         
+        # Single pass over the responses
+        agent_roles = []
+        total_confidence = 0.0
+        total_processing_time = 0.0
+        for resp in agent_responses:
+            agent_roles.append(resp.metadata.get("agent_role", "unknown"))
+            total_confidence += resp.confidence
+            total_processing_time += resp.processing_time
+        
+        agent_count = len(agent_responses)
+        
         metadata = {
             "user_id": context.user_id,
             "session_id": context.session_id,
-            "agent_count": len(agent_responses),
-            "agent_roles": [resp.metadata.get("agent_role", "unknown") 
-                           for resp in agent_responses],
-            "total_confidence": sum(resp.confidence for resp in agent_responses),
-            "average_confidence": sum(resp.confidence for resp in agent_responses) / len(agent_responses) if agent_responses else 0.0,
-            "total_processing_time": sum(resp.processing_time for resp in agent_responses),
-            "user_profile_keys": list(context.user_profile.keys()),
+            "agent_count": agent_count,
+            "agent_roles": agent_roles,
+            "total_confidence": total_confidence,
+            "average_confidence": total_confidence / agent_count if agent_count else 0.0,
+            "total_processing_time": total_processing_time,
+            "user_profile_keys": list(context.user_profile),
             "conversation_history_length": len(context.conversation_history)
         }
         
         return metadata
     
-    def _update_metrics(self, processing_time: float, success: bool):
+    def _update_metrics(self, elapsed_ns: int, success: bool):
         """Update orchestration metrics"""
         if success:
             self.successful_orchestrations += 1
         
-        # Update average processing time
-        if self.total_orchestrations > 0:
-            self.average_processing_time = (
-                (self.average_processing_time * (self.total_orchestrations - 1) + processing_time) 
-                / self.total_orchestrations
-            )
+        self.total_processing_time_ns += elapsed_ns
+        self.timed_orchestrations += 1
     
     def get_orchestrator_metrics(self) -> Dict[str, Any]:
         """Get orchestrator performance metrics"""
@@ -324,7 +648,12 @@ class AgentOrchestrator:
             "total_orchestrations": self.total_orchestrations,
             "successful_orchestrations": self.successful_orchestrations,
             "success_rate": success_rate,
-            "average_processing_time": self.average_processing_time
+            "average_processing_time": (
+                self.total_processing_time_ns / self.timed_orchestrations / 1e9
+                if self.timed_orchestrations > 0 else 0.0
+            ),
+            "routing_cache_hits": self.routing_cache.hits,
+            "routing_cache_misses": self.routing_cache.misses
         }
     
     async def get_agent_status(self) -> Dict[str, Any]:
@@ -0,0 +1,65 @@
+"""
+Routing Cache
+Semantic cache of agent routing decisions keyed by query embedding
+"""
+
+from typing import Hashable, List, Tuple, Optional, Sequence
+
+import numpy as np
+
+class RoutingCache:
+    """In-memory nearest-neighbour cache of (agent role, priority) assignments
+
+    Entries are scoped (e.g. by user profile), and a lookup only matches
+    entries cached under the same scope. Storage is a fixed ring buffer, so
+    a put overwrites the oldest entry once `max_entries` is reached.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 1024):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Allocated on the first put, once the embedding width is known
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes = np.empty(max_entries, dtype=object)
+        self._assignments: List[Optional[List[Tuple[str, float]]]] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def get(self, query_vector: Sequence[float],
+            scope: Hashable = None) -> Optional[List[Tuple[str, float]]]:
+        """Return the assignment of the most similar cached query in `scope`, if close enough"""
+        if not self._size:
+            self.misses += 1
+            return None
+
+        # Rows are unit-normalized, so the dot product is the cosine similarity
+        scores = self._vectors[:self._size] @ self._normalize(query_vector)
+        scores[self._scopes[:self._size] != scope] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._assignments[best]
+
+    def put(self, query_vector: Sequence[float], assignment: List[Tuple[str, float]],
+            scope: Hashable = None):
+        """Cache an assignment under `scope`, overwriting the oldest entry when full"""
+        vector = self._normalize(query_vector)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        slot = self._next
+        self._vectors[slot] = vector
+        self._scopes[slot] = scope
+        self._assignments[slot] = assignment
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
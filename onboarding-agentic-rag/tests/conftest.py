@@ -0,0 +1,59 @@
+"""
+Shared test setup
+Registers minimal stand-ins for the modules the orchestrator imports when
+they are absent from the tree
+"""
+
+import os
+import sys
+import types
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+def _register(name: str, **attrs: Any) -> None:
+    """Install a stand-in module unless the real one can be imported"""
+    try:
+        __import__(name)
+    except ModuleNotFoundError as e:
+        if e.name not in (name, name.rsplit(".", 1)[0]):
+            raise
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+
+
+@dataclass
+class AgentContext:
+    query: str
+    user_id: str = "user"
+    session_id: str = "session"
+    user_profile: Dict[str, Any] = field(default_factory=dict)
+    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class AgentResponse:
+    content: str
+    confidence: float
+    sources: List[Any] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class AgentRegistry:
+    def get(self, role: str) -> Optional[Any]:
+        return None
+
+
+class VectorService:
+    pass
+
+
+# The module-level orchestrator builds its LLM client at import time
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+# Only required settings; optional ones fall back to their getattr defaults
+_register("src.core.config", settings=types.SimpleNamespace(LLM_MODEL="gpt-4"))
+_register("src.agents.base_agent", AgentContext=AgentContext,
+          AgentResponse=AgentResponse, agent_registry=AgentRegistry())
+_register("src.core.vector_service", VectorService=VectorService)
@@ -0,0 +1,93 @@
+"""Unit tests for the LLM micro-batcher"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.core.llm_batcher import LLMBatcher
+
+
+class RecordingRunnable:
+    """Runnable double that doubles each input and records every batch"""
+
+    def __init__(self, fail_on=(), raise_batch=False):
+        self.batches = []
+        self.fail_on = set(fail_on)
+        self.raise_batch = raise_batch
+
+    async def abatch(self, inputs, return_exceptions=False):
+        self.batches.append([payload["n"] for payload in inputs])
+        if self.raise_batch:
+            raise RuntimeError("backend down")
+        return [
+            ValueError(payload["n"]) if payload["n"] in self.fail_on else payload["n"] * 2
+            for payload in inputs
+        ]
+
+
+@pytest_asyncio.fixture
+async def make_batcher():
+    """Build batchers and stop their collector tasks after the test"""
+    batchers = []
+
+    def factory(runnable, max_batch=16, max_wait_ms=50):
+        batcher = LLMBatcher(runnable, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        batchers.append(batcher)
+        return batcher
+
+    yield factory
+
+    for batcher in batchers:
+        if batcher._worker is not None:
+            batcher._worker.cancel()
+            await asyncio.gather(batcher._worker, return_exceptions=True)
+
+
+async def submit_all(batcher, count):
+    return await asyncio.gather(
+        *(batcher.submit({"n": n}) for n in range(count)),
+        return_exceptions=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_are_coalesced_into_one_batch(make_batcher):
+    runnable = RecordingRunnable()
+    batcher = make_batcher(runnable)
+
+    results = await submit_all(batcher, 5)
+
+    assert results == [0, 2, 4, 6, 8]
+    assert runnable.batches == [[0, 1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch(make_batcher):
+    runnable = RecordingRunnable()
+    batcher = make_batcher(runnable, max_batch=2)
+
+    results = await submit_all(batcher, 5)
+
+    assert results == [0, 2, 4, 6, 8]
+    assert [len(batch) for batch in runnable.batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_item_errors_only_reach_their_own_caller(make_batcher):
+    batcher = make_batcher(RecordingRunnable(fail_on={1}))
+
+    results = await submit_all(batcher, 3)
+
+    assert results[0] == 0
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 4
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_fans_out_to_every_caller(make_batcher):
+    batcher = make_batcher(RecordingRunnable(raise_batch=True))
+
+    results = await submit_all(batcher, 3)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
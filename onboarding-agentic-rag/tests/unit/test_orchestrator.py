@@ -0,0 +1,146 @@
+"""Unit tests for agent orchestration"""
+
+import asyncio
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+
+from src.agents.base_agent import AgentContext, AgentResponse
+from src.core import orchestrator as orchestrator_module
+from src.core.config import settings
+from src.core.orchestrator import AgentOrchestrator, QualitySchema, SynthesisSchema
+
+
+@pytest.fixture
+def orchestrator():
+    return AgentOrchestrator()
+
+
+class FakeChain:
+    """Stands in for a composed chain, returning or raising a fixed outcome"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def ainvoke(self, inputs):
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+def response(content, confidence, role="hr_agent"):
+    return AgentResponse(content=content, confidence=confidence,
+                         metadata={"agent_role": role})
+
+
+@pytest.mark.asyncio
+async def test_dominant_response_skips_synthesis(orchestrator):
+    orchestrator.synthesis_chain = None  # would fail if it were invoked
+    responses = [response("low", 0.5, "it_agent"), response("high", 0.95)]
+
+    result = await orchestrator._synthesize_responses(
+        "query", responses, AgentContext(query="query"))
+
+    assert result == ("high", 0.95, {})
+
+
+@pytest.mark.asyncio
+async def test_close_responses_are_synthesized(orchestrator):
+    orchestrator.synthesis_chain = FakeChain(SynthesisSchema(
+        response="merged", completeness=0.6, accuracy=1.0, relevance=0.8, clarity=0.6))
+    responses = [response("a", 0.95), response("b", 0.7, "it_agent")]
+
+    content, confidence, metadata = await orchestrator._synthesize_responses(
+        "query", responses, AgentContext(query="query"))
+
+    assert content == "merged"
+    assert confidence == pytest.approx(0.75)
+    assert metadata["quality"]["accuracy"] == 1.0
+
+
+def test_out_of_range_scores_are_clamped():
+    quality = QualitySchema(completeness=8, accuracy=-1, relevance=0.5, clarity=1.2)
+
+    assert quality.model_dump() == {
+        "completeness": 1.0, "accuracy": 0.0, "relevance": 0.5, "clarity": 1.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_unparseable_synthesis_keeps_the_answer(orchestrator):
+    truncated = '{"response": "Your laptop ships on day one", "completeness": 0.'
+    orchestrator.synthesis_chain = FakeChain(OutputParserException(
+        "cut off at max_tokens", llm_output=truncated))
+    responses = [response("a", 0.8), response("b", 0.7, "it_agent")]
+
+    result = await orchestrator._synthesize_responses(
+        "query", responses, AgentContext(query="query"))
+
+    assert result == ("Your laptop ships on day one", None,
+                      {"quality_error": "unparseable synthesis output"})
+
+
+def test_salvage_falls_back_to_raw_output():
+    error = OutputParserException("not JSON", llm_output="Plain text answer")
+
+    assert AgentOrchestrator._salvage_response(error) == "Plain text answer"
+
+
+class FakeAgent:
+    def __init__(self, role, outcome):
+        self.role = role
+        self.outcome = outcome
+
+    async def execute(self, context):
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.mark.asyncio
+async def test_agent_failures_are_isolated(orchestrator):
+    assignments = [
+        (FakeAgent("it_agent", response("it", 0.6, role=None)), 0.5),
+        (FakeAgent("hr_agent", response("hr", 0.8, role=None)), 1.0),
+        (FakeAgent("broken_agent", RuntimeError("boom")), 0.9),
+        (FakeAgent("cancelled_agent", asyncio.CancelledError()), 0.8),
+    ]
+
+    responses = await orchestrator._execute_agents(assignments, AgentContext(query="query"))
+
+    # Ordered by routing priority and labelled with the real agent role
+    assert [r.content for r in responses] == ["hr", "it"]
+    assert [r.metadata["agent_role"] for r in responses] == ["hr_agent", "it_agent"]
+
+
+class HungAgent(FakeAgent):
+    async def execute(self, context):
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def short_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_TIMEOUT_S", 0.05, raising=False)
+
+
+@pytest.mark.asyncio
+async def test_hung_agent_is_dropped(orchestrator, short_timeout):
+    assignments = [
+        (HungAgent("hung_agent", None), 1.0),
+        (FakeAgent("hr_agent", response("hr", 0.8, role=None)), 0.5),
+    ]
+
+    responses = await orchestrator._execute_agents(assignments, AgentContext(query="query"))
+
+    assert [r.content for r in responses] == ["hr"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_covers_semaphore_wait(orchestrator, short_timeout, monkeypatch):
+    saturated = asyncio.Semaphore(1)
+    monkeypatch.setattr(orchestrator_module, "agent_semaphore", saturated)
+    agent = FakeAgent("hr_agent", response("hr", 0.8))
+
+    async with saturated:
+        with pytest.raises(asyncio.TimeoutError):
+            await orchestrator._run_agent(agent, AgentContext(query="query"))
@@ -0,0 +1,62 @@
+"""Unit tests for the semantic routing cache"""
+
+from src.core.routing_cache import RoutingCache
+
+ASSIGNMENT = [("hr_agent", 1.0), ("it_agent", 0.5)]
+
+
+def test_similar_query_hits():
+    cache = RoutingCache(threshold=0.85)
+    cache.put([1.0, 0.0, 0.0], ASSIGNMENT)
+
+    # Scaled and slightly rotated: cosine ~0.995
+    assert cache.get([2.0, 0.2, 0.0]) == ASSIGNMENT
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_dissimilar_query_misses():
+    cache = RoutingCache(threshold=0.85)
+    cache.put([1.0, 0.0, 0.0], ASSIGNMENT)
+
+    # cosine ~0.71, below the threshold
+    assert cache.get([1.0, 1.0, 0.0]) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_empty_cache_misses():
+    cache = RoutingCache()
+
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.misses == 1
+
+
+def test_entries_only_match_their_own_scope():
+    cache = RoutingCache()
+    cache.put([1.0, 0.0], ASSIGNMENT, scope=b"engineer")
+
+    assert cache.get([1.0, 0.0], scope=b"engineer") == ASSIGNMENT
+    assert cache.get([1.0, 0.0], scope=b"designer") is None
+    assert cache.get([1.0, 0.0]) is None
+
+
+def test_oldest_entry_is_evicted_first():
+    cache = RoutingCache(max_entries=2)
+    cache.put([1.0, 0.0, 0.0], [("first", 1.0)])
+    cache.put([0.0, 1.0, 0.0], [("second", 1.0)])
+    cache.put([0.0, 0.0, 1.0], [("third", 1.0)])
+
+    assert cache.get([1.0, 0.0, 0.0]) is None
+    assert cache.get([0.0, 1.0, 0.0]) == [("second", 1.0)]
+    assert cache.get([0.0, 0.0, 1.0]) == [("third", 1.0)]
+
+
+def test_ring_buffer_keeps_the_newest_entries_after_wrapping():
+    cache = RoutingCache(max_entries=2)
+    for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0],
+                                [0.0, 0.0, 1.0], [1.0, 1.0, 0.0])):
+        cache.put(vector, [(f"agent_{i}", 1.0)])
+
+    assert cache.get([1.0, 0.0, 0.0]) is None
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.get([0.0, 0.0, 1.0]) == [("agent_2", 1.0)]
+    assert cache.get([1.0, 1.0, 0.0]) == [("agent_3", 1.0)]